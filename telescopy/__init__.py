@@ -21,8 +21,16 @@ if sys.version_info < tuple((int(val) for val in __minimum_python_version__.spli
 if not _ASTROPY_SETUP_:
     # For egg_info test builds to pass, put package imports here.
     from .telescope import *
+    from .response import *
     from .filter import *
+    from .filterbank import *
     from .vega import *
     from .imager import *
+    from .psf import *
+    from .frames import *
     from .star import *
     from .skymodel import *
+    from .catalog import *
+    from .parallel import *
+    from .stream import *
+    from .cache import *
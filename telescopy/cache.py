@@ -0,0 +1,158 @@
+import weakref
+from collections import OrderedDict, namedtuple
+from hashlib import sha1
+
+import numpy as np
+import astropy.units as u
+
+from .star import TargetCollection
+from .utils import to_value
+
+__all__ = ['CountsCache']
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Digests of arrays which have already been hashed, keyed by ``id``
+_digests = {}
+
+
+def _digest(array):
+    """
+    Stable hash of the contents of ``array``, memoized per array object.
+
+    Modifying ``array`` in place does not change its memoized digest.
+    """
+    if array is None:
+        return None
+    cached = _digests.get(id(array))
+    if cached is not None and cached[0]() is array:
+        return cached[1]
+
+    values = np.ascontiguousarray(getattr(array, 'value', array))
+    digest = sha1(values.tobytes()).hexdigest()
+    unit = getattr(array, 'unit', None)
+    if unit is not None:
+        digest += str(unit)
+
+    try:
+        ref = weakref.ref(array, lambda ref, key=id(array): _digests.pop(key,
+                                                                         None))
+    except TypeError:
+        return digest
+    _digests[id(array)] = (ref, digest)
+    return digest
+
+
+class CountsCache(object):
+    """
+    Least-recently-used cache of photon rates.
+
+    Pass an instance as the ``cache`` argument of
+    `~telescopy.Telescope.photons` or `~telescopy.Imager.counts` to reuse
+    earlier results. Since counts scale linearly with exposure duration, the
+    cache stores photon rates, and calls which differ only in exposure
+    duration (or in the imager's quantum efficiency and gain, which are
+    applied afterwards) share an entry.
+
+    Entries are keyed on the target's parameters, the filter's name and
+    data, the sky model's data and the telescope's parameters, so passing a
+    different target, filter, sky model or telescope, or reassigning their
+    attributes, gives a cache miss.
+
+    The digests of filter and sky model arrays are memoized per array
+    object, so arrays modified in place are not detected and keep returning
+    the rates cached before the modification. Call
+    `~telescopy.CountsCache.clear` (and
+    `~telescopy.SpectralResponse.update` with ``force=True`` on the
+    telescope's response) after doing so.
+    """
+    def __init__(self, maxsize=1024):
+        """
+        Parameters
+        ----------
+        maxsize : int
+            Maximum number of cached photon rates
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._rates = OrderedDict()
+
+    def __len__(self):
+        return len(self._rates)
+
+    def info(self):
+        """
+        Cache statistics.
+
+        Returns
+        -------
+        info : tuple
+            Named tuple of ``hits``, ``misses``, ``maxsize`` and ``currsize``
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics.
+        """
+        self._rates.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(telescope, target, filter, sky_model=None):
+        """
+        Cache key of a telescope, target, filter and sky model combination.
+        """
+        if sky_model is None:
+            sky_key = None
+        else:
+            sky_key = (_digest(sky_model.wavelength),
+                       _digest(sky_model.transmittance))
+        return ((to_value(telescope.aperture_diameter, u.m),
+                 telescope.throughput),
+                (type(target).__name__, target._T_eff, target._radius,
+                 target._distance),
+                (filter.name, _digest(filter.wavelength),
+                 _digest(filter.transmissivity)),
+                sky_key)
+
+    def photon_rate(self, telescope, target, filter, sky_model=None):
+        """
+        Photons per second collected from ``target``, from the cache if
+        possible.
+
+        Parameters
+        ----------
+        telescope : `~telescopy.Telescope`
+            Telescope object
+        target : `~telescopy.BlackBody`
+            Target object
+        filter : `~telescopy.Filter`
+            Filter object
+        sky_model : `~telescopy.SkyModel` or None
+            Atmospheric transmittance model
+
+        Returns
+        -------
+        rate : float or `~numpy.ndarray`
+            Photons per second (collections are not cached)
+        """
+        if isinstance(target, TargetCollection):
+            return telescope.response(filter, sky_model)._photon_rate(target)
+
+        key = self.key(telescope, target, filter, sky_model)
+        rate = self._rates.get(key)
+        if rate is not None:
+            self.hits += 1
+            self._rates.move_to_end(key)
+            return rate
+
+        self.misses += 1
+        rate = telescope.response(filter, sky_model)._photon_rate(target)
+        self._rates[key] = rate
+        if len(self._rates) > self.maxsize:
+            self._rates.popitem(last=False)
+        return rate
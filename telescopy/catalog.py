@@ -0,0 +1,182 @@
+import csv
+from itertools import islice
+
+import numpy as np
+import astropy.units as u
+from astropy.io import fits
+
+from .star import TargetCollection
+
+__all__ = ['read_catalog', 'iter_catalog', 'catalog_length']
+
+
+def _column(table, name, default_unit):
+    """
+    Values of column ``name`` in ``default_unit``, using the column's own
+    unit when it has one.
+    """
+    column = table[name]
+    unit = getattr(column, 'unit', None)
+    values = np.asarray(column, dtype=float)
+    if unit is None:
+        return values
+    return (values * u.Unit(unit)).to_value(default_unit)
+
+
+def _collection(table, T_eff_column, radius_column, distance_column,
+                radius_unit, distance_unit):
+    return TargetCollection._from_arrays(
+        np.ascontiguousarray(_column(table, T_eff_column, u.K)),
+        np.ascontiguousarray(
+            (_column(table, radius_column, radius_unit) *
+             radius_unit).to_value(u.m)),
+        np.ascontiguousarray(
+            (_column(table, distance_column, distance_unit) *
+             distance_unit).to_value(u.m)))
+
+
+def read_catalog(catalog, T_eff_column='T_eff', radius_column='radius',
+                 distance_column='distance', radius_unit=u.R_sun,
+                 distance_unit=u.pc):
+    """
+    Read a catalog of blackbody targets.
+
+    Columns with units attached (e.g. in an astropy `~astropy.table.Table`
+    or a FITS table) are converted from their own units; columns without
+    units are assumed to be in K, ``radius_unit`` and ``distance_unit``.
+
+    Parameters
+    ----------
+    catalog : `~numpy.ndarray`, `~astropy.table.Table` or str
+        Structured array, table, or path to a CSV, FITS or ``.npy`` file
+    T_eff_column : str
+        Name of the effective temperature column
+    radius_column : str
+        Name of the radius column
+    distance_column : str
+        Name of the distance column
+    radius_unit : `~astropy.units.Unit`
+        Unit of the radius column if it has none
+    distance_unit : `~astropy.units.Unit`
+        Unit of the distance column if it has none
+
+    Returns
+    -------
+    targets : `~telescopy.TargetCollection`
+        Targets in the catalog
+    """
+    if isinstance(catalog, TargetCollection):
+        return catalog
+
+    if isinstance(catalog, str):
+        from astropy.table import Table
+
+        if catalog.endswith('.npy'):
+            catalog = np.load(catalog, mmap_mode='r')
+        elif catalog.endswith('.csv'):
+            catalog = Table.read(catalog, format='ascii.csv')
+        else:
+            catalog = Table.read(catalog)
+
+    return _collection(catalog, T_eff_column, radius_column, distance_column,
+                       radius_unit, distance_unit)
+
+
+def _iter_csv(path, chunk_size, start, columns):
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        names = [name.strip() for name in next(reader)]
+        indices = [names.index(name) for name in columns]
+        # Skip blank lines (such as a trailing empty line), so that rows are
+        # counted as in `~telescopy.read_catalog`
+        reader = (row for row in reader if row)
+        for _ in islice(reader, start):
+            pass
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            values = np.array([[row[i] for i in indices] for row in rows],
+                              dtype=float)
+            yield {name: values[:, i] for i, name in enumerate(columns)}
+
+
+def _iter_fits(path, chunk_size, start, columns):
+    with fits.open(path, memmap=True) as hdul:
+        hdu = hdul[1]
+        units = {column.name: column.unit for column in hdu.columns}
+        for lo in range(start, hdu.header['NAXIS2'], chunk_size):
+            chunk = {}
+            for name in columns:
+                values = np.array(hdu.data[name][lo:lo + chunk_size],
+                                  dtype=float)
+                unit = units[name]
+                chunk[name] = values * u.Unit(unit) if unit else values
+            yield chunk
+
+
+def _iter_npy(path, chunk_size, start):
+    data = np.load(path, mmap_mode='r')
+    for lo in range(start, len(data), chunk_size):
+        yield data[lo:lo + chunk_size]
+
+
+def catalog_length(path):
+    """
+    Number of rows in a FITS or ``.npy`` catalog file, without reading it.
+
+    Parameters
+    ----------
+    path : str
+        Path to the catalog
+
+    Returns
+    -------
+    length : int or None
+        Number of rows, or None for CSV files (which would have to be read
+        in full to count them)
+    """
+    if path.endswith('.csv'):
+        return None
+    elif path.endswith('.npy'):
+        return len(np.load(path, mmap_mode='r'))
+    return fits.getheader(path, 1)['NAXIS2']
+
+
+def iter_catalog(path, chunk_size=100000, start=0, T_eff_column='T_eff',
+                 radius_column='radius', distance_column='distance',
+                 radius_unit=u.R_sun, distance_unit=u.pc):
+    """
+    Read a catalog file in chunks of rows.
+
+    Only one chunk is held in memory at a time: ``.npy`` files are
+    memory-mapped, FITS tables are read lazily with ``memmap=True``, and CSV
+    files are parsed ``chunk_size`` lines at a time.
+
+    Parameters
+    ----------
+    path : str
+        Path to a CSV, FITS or ``.npy`` catalog
+    chunk_size : int
+        Number of rows per chunk
+    start : int
+        Index of the first row to read
+    T_eff_column, radius_column, distance_column, radius_unit, distance_unit
+        See `~telescopy.read_catalog`
+
+    Yields
+    ------
+    targets : `~telescopy.TargetCollection`
+        Targets in the next ``chunk_size`` rows
+    """
+    columns = [T_eff_column, radius_column, distance_column]
+    if path.endswith('.csv'):
+        chunks = _iter_csv(path, chunk_size, start, columns)
+    elif path.endswith('.npy'):
+        chunks = _iter_npy(path, chunk_size, start)
+    else:
+        chunks = _iter_fits(path, chunk_size, start, columns)
+
+    for chunk in chunks:
+        yield _collection(chunk, T_eff_column, radius_column,
+                          distance_column, radius_unit, distance_unit)
@@ -1,14 +1,120 @@
 import os
+import json
 from glob import glob
 import numpy as np
 import astropy.units as u
-import matplotlib.pyplot as plt
 
-__all__ = ['Filter']
+from .utils import cache_dir
+
+__all__ = ['Filter', 'register_filter']
 
 
 filter_path = os.path.join(os.path.dirname(__file__), 'data', 'filters')
 
+# Paths of filter files by name, indexed on first use
+_filter_paths = None
+
+# Shared, read-only `Filter` objects by name
+_filters = {}
+
+# Version of the binary filter archive format
+_archive_version = 1
+
+# Memory-mapped binary archive of the bundled filters and its index, loaded
+# on first use
+_archive = None
+
+
+def _archive_paths():
+    directory = cache_dir()
+    return (os.path.join(directory, 'filters.npy'),
+            os.path.join(directory, 'filters.json'))
+
+
+def _bundled_files():
+    """
+    Size and modification time of each bundled filter file, by file name.
+    """
+    files = {}
+    for path in sorted(glob(os.path.join(filter_path, '*.txt'))):
+        stat = os.stat(path)
+        files[os.path.basename(path)] = [stat.st_size, stat.st_mtime]
+    return files
+
+
+def _write_archive(data_path, index_path, files):
+    """
+    Parse every bundled filter file and write them to one binary archive.
+
+    The archive is a single ``(2, n)`` float64 array of the concatenated
+    wavelengths (Angstrom) and transmissivities, plus a JSON index of the
+    offset and length of each filter. Both files are written to temporary
+    paths and moved into place, so concurrent readers never see a partial
+    archive.
+    """
+    curves = []
+    index = {'version': _archive_version, 'files': files, 'filters': {}}
+    offset = 0
+    for file_name in files:
+        curve = np.loadtxt(os.path.join(filter_path, file_name), unpack=True)
+        index['filters'][file_name] = {'offset': offset,
+                                       'length': curve.shape[1],
+                                       'wavelength_unit': 'Angstrom'}
+        offset += curve.shape[1]
+        curves.append(curve)
+
+    suffix = '.{0}.tmp'.format(os.getpid())
+    with open(data_path + suffix, 'wb') as f:
+        np.save(f, np.concatenate(curves, axis=1))
+    with open(index_path + suffix, 'w') as f:
+        json.dump(index, f)
+    os.replace(data_path + suffix, data_path)
+    os.replace(index_path + suffix, index_path)
+
+
+def _filter_archive():
+    """
+    Memory-mapped archive of the bundled filters and its index, built (or
+    rebuilt, if the bundled files have changed) on first use.
+
+    Returns None if the archive can't be written, in which case filters are
+    read from their text files.
+    """
+    global _archive
+    if _archive is None:
+        files = _bundled_files()
+        try:
+            data_path, index_path = _archive_paths()
+            try:
+                with open(index_path) as f:
+                    index = json.load(f)
+                valid = (index['version'] == _archive_version and
+                         index['files'] == files)
+            except (OSError, ValueError, KeyError):
+                valid = False
+            if not valid:
+                _write_archive(data_path, index_path, files)
+                with open(index_path) as f:
+                    index = json.load(f)
+            _archive = (np.load(data_path, mmap_mode='r'), index)
+        except OSError:
+            _archive = False
+    return _archive or None
+
+
+def _filter_index():
+    """
+    Index of the filter files bundled with telescopy (plus registered
+    filters), built on first use.
+    """
+    global _filter_paths
+    if _filter_paths is None:
+        _filter_paths = {os.path.basename(path).split('_')[1]
+                         .replace('.', '_')[:-4]: path
+                         for path in sorted(glob(os.path.join(filter_path,
+                                                              '*.txt')))}
+    return _filter_paths
+
 
 class Filter(object):
     """
@@ -20,7 +126,8 @@ class Filter(object):
         Parameters
         ----------
         wavelength : `~astropy.units.Quantity`
-            Wavelength array for the transmissivity curve.
+            Wavelength array for the transmissivity curve (in Angstrom if it
+            has no unit)
         transmissivity : `~numpy.ndarray`
             Transmissivity of the filter
         path : str
@@ -36,41 +143,94 @@ class Filter(object):
             self.wavelength = wavelength * u.Angstrom
             self.transmissivity = transmissivity
         else:
-            self.wavelength = wavelength
+            # Plain arrays of wavelengths are assumed to be in Angstrom
+            self.wavelength = u.Quantity(wavelength, u.Angstrom, copy=False)
             self.transmissivity = transmissivity
 
-        self.lam0 = (np.sum(wavelength * transmissivity) /
-                     np.sum(transmissivity) * u.Angstrom)
+        self.lam0 = (np.sum(self.wavelength * self.transmissivity) /
+                     np.sum(self.transmissivity)).to(u.Angstrom)
 
     @classmethod
     def from_name(cls, name):
         """
         Transmissivity of a built-in filter.
 
+        Filters are read from disk once and shared: repeated calls with the
+        same name return the same object, with read-only arrays.
+
         Parameters
         ----------
         name : str
             Must be one of the filters returned by
             `~telescopy.Filter.available_filters()`.
         """
-        path = os.path.join(filter_path, '*' + name.replace('_', '.') + '.txt')
-        globbed_path = glob(path)
-        if len(globbed_path) < 1:
-            raise ValueError('No filter found matching name "{0}"'.format(name))
-        return cls(path=globbed_path[0], name=name)
+        filter = _filters.get(name)
+        if filter is not None:
+            return filter
+
+        index = _filter_index()
+        path = index.get(name)
+        if path is None:
+            # Fall back on matching the end of the file name, as in the
+            # pattern ``*<name>.txt``
+            suffix = name.replace('_', '.') + '.txt'
+            matches = [p for p in index.values()
+                       if p is not None and p.endswith(suffix)]
+            if len(matches) < 1:
+                raise ValueError('No filter found matching name "{0}"'
+                                 .format(name))
+            path = matches[0]
+
+        filter = cls._from_archive(path, name)
+        if filter is None:
+            filter = cls(path=path, name=name)
+        filter._read_only()
+        _filters[name] = filter
+        return filter
+
+    @classmethod
+    def _from_archive(cls, path, name):
+        """
+        Filter backed by zero-copy views of the binary filter archive, or
+        None if ``path`` isn't a bundled filter.
+        """
+        archive = _filter_archive()
+        if archive is None:
+            return None
+        data, index = archive
+        entry = index['filters'].get(os.path.basename(path))
+        if entry is None or os.path.dirname(path) != filter_path:
+            return None
+
+        curve = data[:, entry['offset']:entry['offset'] + entry['length']]
+        filter = cls(u.Quantity(np.asarray(curve[0]),
+                                u.Unit(entry['wavelength_unit']), copy=False),
+                     np.asarray(curve[1]), name=name)
+        filter.path = path
+        return filter
+
+    def _read_only(self):
+        """
+        Mark the wavelength and transmissivity arrays as read-only, so that
+        the filter can be shared safely, and return the filter.
+        """
+        for array in (self.wavelength, self.transmissivity):
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False
+        return self
 
     @staticmethod
     def available_filters():
         """
-        Available filters stored in telescopy.
+        Available filters stored in telescopy, and registered with
+        `~telescopy.register_filter`.
 
         Returns
         -------
         filters : list
             List of available filter names
         """
-        return [i.split('_')[1].replace('.', '_')[:-4]
-                for i in glob(os.path.join(filter_path, '*'))]
+        return list(_filter_index())
 
     def plot(self, ax=None):
         """
@@ -86,8 +246,37 @@ class Filter(object):
         ax : `~matplotlib.pyplot.Axes`
             Plot with transmissivity curve
         """
+        import matplotlib.pyplot as plt
+
         if ax is None:
             fig, ax = plt.subplots()
         ax.plot(self.wavelength, self.transmissivity)
         ax.set(xlabel='Wavelength [Angstrom]', ylabel='Transmissivity')
-        return ax
\ No newline at end of file
+        return ax
+
+
+def register_filter(filter, name=None):
+    """
+    Make a filter available to `~telescopy.Filter.from_name`.
+
+    Parameters
+    ----------
+    filter : `~telescopy.Filter` or str
+        Filter object, or path to a two-column text file of wavelength
+        (Angstrom) and transmissivity
+    name : str or None
+        Name of the filter. Defaults to the name of the filter object.
+    """
+    if isinstance(filter, Filter):
+        name = filter.name if name is None else name
+        path = filter.path
+    else:
+        name, path, filter = name, filter, None
+
+    if name is None:
+        raise ValueError('A name is required to register a filter.')
+
+    _filter_index()[name] = path
+    _filters.pop(name, None)
+    if filter is not None:
+        _filters[name] = filter._read_only()
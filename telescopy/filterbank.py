@@ -0,0 +1,186 @@
+import numpy as np
+import astropy.units as u
+
+from .filter import Filter
+from .integrate import cell_edges, trapezoid_weights
+from .star import BlackBody, TargetCollection, _hc, _planck_lambda
+from .utils import quantity_input, to_value
+
+__all__ = ['FilterBank']
+
+
+class FilterBank(object):
+    """
+    Set of filters resampled onto one shared wavelength grid.
+
+    Each filter's transmissivity is interpolated onto the grid and combined
+    with trapezoidal integration weights into one row of a
+    ``(n_filters, n_wavelengths)`` matrix, so that the integrals of a batch
+    of spectra through every filter are a single matrix product.
+    """
+    @quantity_input(wavelength=u.Angstrom)
+    def __init__(self, filters, wavelength=None, sparse=False):
+        """
+        Parameters
+        ----------
+        filters : list
+            `~telescopy.Filter` objects, or names of filters returned by
+            `~telescopy.Filter.available_filters()`
+        wavelength : `~astropy.units.Quantity` or None
+            Sorted common wavelength grid. Defaults to the union of the
+            wavelengths of all ``filters``.
+        sparse : bool
+            Store the weight matrix as a `~scipy.sparse.csr_matrix`, which
+            is faster when the filters cover small, separate parts of the
+            grid.
+        """
+        self.filters = [Filter.from_name(f) if isinstance(f, str) else f
+                        for f in filters]
+
+        if wavelength is None:
+            wavelength = np.unique(np.concatenate(
+                [f.wavelength.to_value(u.Angstrom) for f in self.filters]))
+        else:
+            wavelength = wavelength.to_value(u.Angstrom)
+        self.wavelength = wavelength * u.Angstrom
+
+        self.transmissivity = np.array(
+            [np.interp(wavelength, f.wavelength.to_value(u.Angstrom),
+                       f.transmissivity, left=0, right=0)
+             for f in self.filters])
+
+        self._delta_lambda = trapezoid_weights(wavelength)
+        matrix = self.transmissivity * self._delta_lambda
+        self.sparse = sparse
+        if sparse:
+            from scipy.sparse import csr_matrix
+            matrix = csr_matrix(matrix)
+        self._matrix = matrix
+        self._wavelength = self.wavelength.to_value(u.m)
+
+    @classmethod
+    def from_names(cls, names=None, **kwargs):
+        """
+        Filter bank of built-in filters.
+
+        Parameters
+        ----------
+        names : list or None
+            Names of filters. Defaults to every filter returned by
+            `~telescopy.Filter.available_filters()`.
+        kwargs
+            Passed on to `~telescopy.FilterBank`
+
+        Returns
+        -------
+        bank : `~telescopy.FilterBank`
+            Filter bank
+        """
+        if names is None:
+            names = Filter.available_filters()
+        return cls(names, **kwargs)
+
+    @property
+    def names(self):
+        """
+        Names of the filters in the bank.
+        """
+        return [f.name for f in self.filters]
+
+    def __len__(self):
+        return len(self.filters)
+
+    def _dot(self, matrix, values):
+        """
+        Product of ``values`` of shape ``(..., n_wavelengths)`` with the
+        transpose of ``matrix``.
+        """
+        values = np.asarray(values)
+        flat = values.reshape(-1, values.shape[-1])
+        result = np.asarray((matrix @ flat.T).T)
+        return result.reshape(values.shape[:-1] + (len(self),))
+
+    def integrate(self, flux):
+        """
+        Integrate spectra through every filter.
+
+        Parameters
+        ----------
+        flux : `~astropy.units.Quantity` or `~numpy.ndarray`
+            Spectral flux densities sampled on
+            `~telescopy.FilterBank.wavelength`, with shape
+            ``(..., n_wavelengths)``
+
+        Returns
+        -------
+        integral : `~astropy.units.Quantity` or `~numpy.ndarray`
+            Integral of the flux times the transmissivity over wavelength,
+            with shape ``(..., n_filters)``. Quantities are returned in the
+            flux unit times Angstrom.
+        """
+        unit = getattr(flux, 'unit', None)
+        integral = self._dot(self._matrix, getattr(flux, 'value', flux))
+        if unit is None:
+            return integral
+        return integral * unit * u.Angstrom
+
+    @quantity_input(exposure_duration=u.s)
+    def photons(self, telescope, target, exposure_duration, sky_model=None,
+                chunk_size=4096):
+        """
+        Number of photons collected from each target in every filter.
+
+        Parameters
+        ----------
+        telescope : `~telescopy.Telescope`
+            Telescope object
+        target : `~telescopy.BlackBody` or `~telescopy.TargetCollection`
+            Target object
+        exposure_duration : `~astropy.units.Quantity`
+            Exposure duration (s, or compatible unit)
+        sky_model : `~telescopy.SkyModel` or None
+            Atmospheric transmittance model
+        chunk_size : int
+            Number of targets evaluated per matrix product
+
+        Returns
+        -------
+        n_photons : `~numpy.ndarray`
+            Photons with shape ``(n_filters,)`` for a single target, or
+            ``(n_targets, n_filters)`` for a collection
+        """
+        wavelength = self.wavelength.to_value(u.Angstrom)
+        if sky_model is not None:
+            sky = sky_model.rebin(cell_edges(wavelength) * u.Angstrom)
+        else:
+            sky = 1
+
+        aperture = np.pi * (to_value(telescope.aperture_diameter, u.m) / 2)**2
+        # Photons per second per unit spectral radiance (W / m^3 / sr), per
+        # Angstrom of the integration weights in ``self._matrix``
+        scale = (telescope.throughput * sky * np.pi * aperture *
+                 self._wavelength / _hc * 1e-10)
+        if self.sparse:
+            matrix = self._matrix.multiply(scale).tocsr()
+        else:
+            matrix = self._matrix * scale
+
+        if isinstance(target, BlackBody):
+            target = TargetCollection._from_arrays(
+                np.array([target._T_eff]), np.array([target._radius]),
+                np.array([target._distance]))
+            single = True
+        else:
+            single = False
+
+        n_photons = np.empty((len(target), len(self)))
+        for start, chunk in zip(range(0, len(target), chunk_size),
+                                target.chunks(chunk_size)):
+            irradiance = _planck_lambda(self._wavelength,
+                                        chunk._T_eff[:, np.newaxis])
+            n_photons[start:start + len(chunk)] = self._dot(matrix,
+                                                            irradiance)
+
+        n_photons *= (target._dilution[:, np.newaxis] *
+                      to_value(exposure_duration, u.s))
+        return n_photons[0] if single else n_photons
@@ -0,0 +1,179 @@
+import numpy as np
+import astropy.units as u
+
+from .utils import quantity_input, to_value
+
+__all__ = ['iter_frames', 'simulate_frames']
+
+# Default number of pixels drawn per batch, which bounds the size of the
+# temporary arrays of each batch
+_batch_pixels = 2**23
+
+
+def _batch_size(shape, batch_size):
+    if batch_size is None:
+        batch_size = max(_batch_pixels // max(int(np.prod(shape)), 1), 1)
+    return batch_size
+
+
+def _frame_batches(image, exposure_duration, n_frames, sky_rate,
+                   dark_current, read_noise, gain, full_well, seed,
+                   batch_size, dtype):
+    """
+    Yield the index of the first frame and the frames of each batch.
+    """
+    image = np.asarray(image, dtype=float)
+    exposure = to_value(exposure_duration, u.s)
+    # Mean number of electrons in each pixel
+    mean = (image * gain +
+            (np.asarray(sky_rate) + np.asarray(dark_current)) * exposure)
+    if np.any(mean < 0):
+        raise ValueError('The mean number of electrons should not be '
+                         'negative.')
+
+    batch_size = _batch_size(image.shape, batch_size)
+    n_batches = -(-n_frames // batch_size)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    streams = seed.spawn(n_batches)
+
+    for batch, stream in enumerate(streams):
+        start = batch * batch_size
+        size = (min(batch_size, n_frames - start),) + mean.shape
+        rng = np.random.default_rng(stream)
+
+        electrons = rng.poisson(mean, size=size).astype(float)
+        if full_well is not None:
+            np.minimum(electrons, full_well, out=electrons)
+        if read_noise:
+            noise = rng.standard_normal(size)
+            noise *= read_noise
+            electrons += noise
+        electrons /= gain
+        np.rint(electrons, out=electrons)
+        if np.issubdtype(dtype, np.integer):
+            # Saturate at the range of the data type rather than wrapping
+            info = np.iinfo(dtype)
+            np.clip(electrons, info.min, info.max, out=electrons)
+        yield start, electrons.astype(dtype, copy=False)
+
+
+@quantity_input(exposure_duration=u.s)
+def iter_frames(image, exposure_duration, n_frames, sky_rate=0,
+                dark_current=0, read_noise=0, gain=1.0, full_well=None,
+                seed=None, batch_size=None, dtype=np.int32):
+    """
+    Simulate noisy exposures of a noiseless image, one frame at a time.
+
+    Frames are drawn in batches of ``batch_size``: the photon (plus sky and
+    dark current) noise of every frame in a batch is drawn in one
+    vectorized Poisson call, and the read noise in one normal call, each
+    batch from its own `~numpy.random.Generator` spawned from ``seed``.
+    The frames are therefore reproducible for a given ``seed`` and
+    ``batch_size``, and only one batch is held in memory at a time.
+
+    Electrons are clipped at ``full_well`` before read noise is added, and
+    converted to ADU by ``gain`` and rounded. For integer ``dtype``, ADU
+    outside the range of the type are clipped to it.
+
+    Parameters
+    ----------
+    image : `~numpy.ndarray`
+        Noiseless image of the sources in ADU, e.g. from
+        `~telescopy.Imager.scene`
+    exposure_duration : `~astropy.units.Quantity`
+        Exposure duration (s, or compatible unit)
+    n_frames : int
+        Number of frames
+    sky_rate : float or `~numpy.ndarray`
+        Sky background, in electrons per pixel per second
+    dark_current : float or `~numpy.ndarray`
+        Dark current, in electrons per pixel per second
+    read_noise : float
+        Standard deviation of the read noise, in electrons
+    gain : float
+        Gain of the detector (e-'s per ADU)
+    full_well : float or None
+        Full-well capacity of the pixels, in electrons
+    seed : int, `~numpy.random.SeedSequence` or None
+        Seed of the random streams
+    batch_size : int or None
+        Number of frames drawn at a time. Defaults to as many frames as fit
+        in about 8 million pixels.
+    dtype : `~numpy.dtype`
+        Data type of the frames
+
+    Yields
+    ------
+    frame : `~numpy.ndarray`
+        Simulated frame, in ADU
+    """
+    for start, frames in _frame_batches(image, exposure_duration, n_frames,
+                                        sky_rate, dark_current, read_noise,
+                                        gain, full_well, seed, batch_size,
+                                        dtype):
+        for frame in frames:
+            yield frame
+
+
+@quantity_input(exposure_duration=u.s)
+def simulate_frames(image, exposure_duration, n_frames, sky_rate=0,
+                    dark_current=0, read_noise=0, gain=1.0, full_well=None,
+                    seed=None, batch_size=None, out=None, dtype=np.int32):
+    """
+    Simulate a stack of noisy exposures of a noiseless image.
+
+    The frames are identical to those yielded by `~telescopy.iter_frames`
+    for the same ``seed`` and ``batch_size``, and are written batch by batch
+    into ``out``, which may be a `~numpy.memmap` for stacks that do not fit
+    in memory.
+
+    Parameters
+    ----------
+    image : `~numpy.ndarray`
+        Noiseless image of the sources in ADU, e.g. from
+        `~telescopy.Imager.scene`
+    exposure_duration : `~astropy.units.Quantity`
+        Exposure duration (s, or compatible unit)
+    n_frames : int
+        Number of frames
+    sky_rate : float or `~numpy.ndarray`
+        Sky background, in electrons per pixel per second
+    dark_current : float or `~numpy.ndarray`
+        Dark current, in electrons per pixel per second
+    read_noise : float
+        Standard deviation of the read noise, in electrons
+    gain : float
+        Gain of the detector (e-'s per ADU)
+    full_well : float or None
+        Full-well capacity of the pixels, in electrons
+    seed : int, `~numpy.random.SeedSequence` or None
+        Seed of the random streams
+    batch_size : int or None
+        Number of frames drawn at a time. Defaults to as many frames as fit
+        in about 8 million pixels.
+    out : `~numpy.ndarray` or None
+        Array of shape ``(n_frames,) + image.shape`` into which the frames
+        are written. A new array of ``dtype`` is allocated if None.
+    dtype : `~numpy.dtype`
+        Data type of the frames, if ``out`` is None. For integer types
+        (including that of ``out``), ADU outside the range of the type are
+        clipped to it.
+
+    Returns
+    -------
+    frames : `~numpy.ndarray`
+        Simulated frames, in ADU (``out`` if it was given)
+    """
+    shape = (n_frames,) + np.shape(image)
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError('out should have shape {0}'.format(shape))
+
+    for start, frames in _frame_batches(image, exposure_duration, n_frames,
+                                        sky_rate, dark_current, read_noise,
+                                        gain, full_well, seed, batch_size,
+                                        out.dtype):
+        out[start:start + len(frames)] = frames
+    return out
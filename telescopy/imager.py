@@ -1,21 +1,234 @@
+from collections import OrderedDict
+
 import astropy.units as u
 import numpy as np
 
-__all__ = ['Imager']
+from .psf import GaussianPSF
+from .utils import quantity_input, to_value
+
+__all__ = ['Imager', 'render_scene']
+
+
+def _gaussian_1d(offset, std):
+    """
+    Normalized one-dimensional Gaussian sampled at pixel ``offset`` from
+    its center.
+    """
+    return np.exp(-0.5 * (offset / std)**2) / (np.sqrt(2 * np.pi) * std)
+
+
+def _gaussian_1d_integrated(offset, std):
+    """
+    Normalized one-dimensional Gaussian integrated over the pixel at
+    ``offset`` from its center, as a difference of error functions.
+    """
+    from scipy.special import erf
+
+    scale = 1 / (np.sqrt(2) * std)
+    return 0.5 * (erf((offset + 0.5) * scale) - erf((offset - 0.5) * scale))
+
+
+_psf_profiles = {'center': _gaussian_1d,
+                 'integrated': _gaussian_1d_integrated}
+
+
+# Cached real FFTs of PSF kernels, keyed by padded image shape, standard
+# deviation, footprint radius and sampling
+_psf_transforms = OrderedDict()
+_psf_transforms_maxsize = 2
+
+# Approximate cost of a real FFT of P pixels, in units of P log2(P) times the
+# cost of stamping one pixel, used to choose between stamping and FFT
+# convolution
+_fft_cost = 0.05
+
+
+def _psf_transform(padded_shape, std, radius, sampling):
+    """
+    Real FFT of the PSF kernel, centered on pixel (0, 0) of an image of
+    ``padded_shape``.
+    """
+    from scipy import fft
+
+    key = (padded_shape, std, radius, sampling)
+    transform = _psf_transforms.get(key)
+    if transform is None:
+        offset = np.arange(-radius, radius + 1)
+        profile = _psf_profiles[sampling](offset, std)
+        kernel = np.zeros(padded_shape)
+        kernel[np.ix_(offset % padded_shape[0],
+                      offset % padded_shape[1])] = np.outer(profile, profile)
+        transform = fft.rfft2(kernel)
+        _psf_transforms[key] = transform
+        if len(_psf_transforms) > _psf_transforms_maxsize:
+            _psf_transforms.popitem(last=False)
+    else:
+        _psf_transforms.move_to_end(key)
+    return transform
 
 
-def gaussian_2d(x, y, x0, y0, std):
-    amp = 1/(2*np.pi*std**2)
-    return amp * np.exp(-0.5 * ((x - x0)**2 + (y - y0)**2)/std**2)
+def _render_stamps(x, y, counts, std, radius, out, sampling, chunk_size):
+    """
+    Add each star to ``out`` within its own footprint.
+    """
+    profile = _psf_profiles[sampling]
+    n_rows, n_columns = out.shape
+    flat = out.reshape(-1)
+    footprint = np.arange(-radius, radius + 1)
+
+    for start in range(0, len(x), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        columns = np.round(x[chunk]).astype(int)[:, np.newaxis] + footprint
+        rows = np.round(y[chunk]).astype(int)[:, np.newaxis] + footprint
+
+        profile_x = profile(columns - x[chunk, np.newaxis], std)
+        profile_y = (profile(rows - y[chunk, np.newaxis], std) *
+                     counts[chunk, np.newaxis])
+
+        inside = (((rows >= 0) & (rows < n_rows))[:, :, np.newaxis] &
+                  ((columns >= 0) & (columns < n_columns))[:, np.newaxis, :])
+        index = rows[:, :, np.newaxis] * n_columns + columns[:, np.newaxis, :]
+        stamps = profile_y[:, :, np.newaxis] * profile_x[:, np.newaxis, :]
+        np.add.at(flat, index[inside], stamps[inside])
+
+
+def _render_fft(x, y, counts, std, radius, out, sampling):
+    """
+    Bin the stars onto the pixel grid and convolve with the PSF by FFT.
+
+    Each star's counts are shared between the four nearest pixels with
+    bilinear weights, which places it to sub-pixel precision. The image is
+    padded by ``radius`` on each side, so that stars just outside the image
+    contribute to it and the convolution does not wrap around.
+    """
+    from scipy import fft
+
+    n_rows, n_columns = out.shape
+    grid_shape = (n_rows + 2 * radius, n_columns + 2 * radius)
+    padded_shape = (fft.next_fast_len(grid_shape[0], real=True),
+                    fft.next_fast_len(grid_shape[1], real=True))
+
+    x = x + radius
+    y = y + radius
+    columns = np.floor(x).astype(int)
+    rows = np.floor(y).astype(int)
+    fraction_x = x - columns
+    fraction_y = y - rows
+
+    indices = []
+    weights = []
+    for row, weight_y in ((rows, 1 - fraction_y), (rows + 1, fraction_y)):
+        for column, weight_x in ((columns, 1 - fraction_x),
+                                 (columns + 1, fraction_x)):
+            inside = ((row >= 0) & (row < grid_shape[0]) &
+                      (column >= 0) & (column < grid_shape[1]))
+            indices.append((row * padded_shape[1] + column)[inside])
+            weights.append((counts * weight_y * weight_x)[inside])
+    grid = np.bincount(np.concatenate(indices), np.concatenate(weights),
+                       minlength=padded_shape[0] * padded_shape[1])
+
+    transform = fft.rfft2(grid.reshape(padded_shape))
+    transform *= _psf_transform(padded_shape, std, radius, sampling)
+    image = fft.irfft2(transform, s=padded_shape)
+    out += image[radius:radius + n_rows, radius:radius + n_columns]
+
+
+def render_scene(shape, x, y, counts, std, radius=None, out=None,
+                 chunk_size=1024, sampling='center', method='auto'):
+    """
+    Render stars with Gaussian PSFs into an image.
+
+    With ``method='stamp'``, each star is stamped into the image only
+    within a square footprint of half-width ``radius`` pixels around its
+    position, so the cost scales with the number of stars times the
+    footprint area rather than the area of the image. Each stamp is the
+    outer product of two one-dimensional profiles, which needs only
+    O(footprint width) special-function evaluations per star.
+
+    With ``method='fft'``, the stars are binned onto the pixel grid (with
+    bilinear sub-pixel placement) and the grid is convolved once with the
+    PSF using real FFTs, at a cost that depends only on the size of the
+    image. The transform of the PSF is cached between calls. Bilinear
+    placement slightly broadens the PSF, by up to half a pixel.
+
+    ``method='auto'`` picks whichever of the two is cheaper for the number
+    of stars, footprint and image size.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape ``(n_rows, n_columns)`` of the image
+    x : `~numpy.ndarray`
+        Column positions of the stars, in pixels. Pixel centers are at
+        integer positions.
+    y : `~numpy.ndarray`
+        Row positions of the stars, in pixels
+    counts : `~numpy.ndarray`
+        Total counts of each star
+    std : float
+        Standard deviation of the Gaussian PSF, in pixels
+    radius : int or None
+        Half-width of the footprint of each star, in pixels. Defaults to
+        five standard deviations.
+    out : `~numpy.ndarray` or None
+        Preallocated C-contiguous float image of shape ``shape``, to which
+        the stars are added. A new image of zeros is allocated if None.
+    chunk_size : int
+        Number of stars stamped at a time, which bounds the size of the
+        temporary stamp array.
+    sampling : {'center', 'integrated'}
+        Evaluate the PSF at the center of each pixel, or integrate it
+        exactly over each pixel, which conserves the flux of each star
+        (within its footprint) even when the PSF is undersampled.
+    method : {'auto', 'stamp', 'fft'}
+        Rendering method
+
+    Returns
+    -------
+    image : `~numpy.ndarray`
+        Image with the stars added (``out`` if it was given)
+    """
+    if sampling not in _psf_profiles:
+        raise ValueError('sampling should be one of {0}, not "{1}"'
+                         .format(sorted(_psf_profiles), sampling))
+    if method not in ('auto', 'stamp', 'fft'):
+        raise ValueError('method should be one of {0}, not "{1}"'
+                         .format(['auto', 'fft', 'stamp'], method))
+    if out is None:
+        out = np.zeros(shape)
+    elif out.shape != tuple(shape) or not out.flags.c_contiguous:
+        raise ValueError('out should be a C-contiguous array of shape {0}'
+                         .format(tuple(shape)))
+    if radius is None:
+        radius = int(np.ceil(5 * std))
+
+    x, y, counts = np.broadcast_arrays(np.atleast_1d(np.asarray(x, float)),
+                                       np.atleast_1d(np.asarray(y, float)),
+                                       np.atleast_1d(np.asarray(counts,
+                                                                float)))
+    x, y, counts = x.ravel(), y.ravel(), counts.ravel()
+
+    if method == 'auto':
+        n_pixels = (shape[0] + 2 * radius) * (shape[1] + 2 * radius)
+        stamp_cost = len(x) * (2 * radius + 1)**2
+        method = ('fft' if stamp_cost > _fft_cost * n_pixels *
+                  np.log2(n_pixels) else 'stamp')
+
+    if method == 'fft':
+        _render_fft(x, y, counts, std, radius, out, sampling)
+    else:
+        _render_stamps(x, y, counts, std, radius, out, sampling, chunk_size)
+    return out
 
 
 class Imager(object):
     """
     Container for an imager.
     """
-    @u.quantity_input(plate_scale=u.arcsec, seeing=u.arcsec)
+    @quantity_input(plate_scale=u.arcsec, seeing=u.arcsec)
     def __init__(self, plate_scale=None, seeing=None, binning=None,
-                 quantum_efficiency=None, gain=None):
+                 quantum_efficiency=None, gain=None, psf_sampling=None,
+                 psf=None):
         """
         Parameters
         ----------
@@ -29,6 +242,12 @@ class Imager(object):
             Quantum efficiency of the detector
         gain : float
             Gain of the detector (e-'s per ADU)
+        psf_sampling : {'center', 'integrated'} or None
+            Sample the Gaussian PSF at pixel centers (default), or integrate
+            it exactly over each pixel
+        psf : `~telescopy.GaussianPSF`, `~telescopy.MoffatPSF`, `~telescopy.TabulatedPSF` or None
+            PSF model used for aperture photometry. Defaults to a Gaussian
+            with standard deviation ``seeing``.
         """
         self.plate_scale = plate_scale  # arcsec / pixel
         self.seeing = seeing
@@ -45,8 +264,83 @@ class Imager(object):
             gain = 1.0
         self.gain = gain  # e- / ADU
 
-    @u.quantity_input(exposure_duration=u.s)
-    def image(self, telescope, target, exposure_duration, n=20):
+        if psf_sampling is None:
+            psf_sampling = 'center'
+        self.psf_sampling = psf_sampling
+
+        self._psf = psf
+        self._aperture_tables = {}
+
+    @property
+    def psf(self):
+        """
+        PSF model used for aperture photometry.
+        """
+        if self._psf is None:
+            return GaussianPSF.from_std(self.seeing)
+        return self._psf
+
+    @psf.setter
+    def psf(self, psf):
+        self._psf = psf
+
+    def _aperture_table(self, psf):
+        """
+        Encircled energy of ``psf`` against radius in binned pixels, cached
+        per PSF parameters, plate scale and binning.
+        """
+        pixel_scale = to_value(self.plate_scale, u.arcsec) * self.binning
+        fwhm = to_value(psf.fwhm, u.arcsec)
+        key = (psf._key, fwhm, pixel_scale)
+        table = self._aperture_tables.get(key)
+        if table is None:
+            radius, encircled_energy = psf.encircled_energy_table()
+            table = (radius * (fwhm / pixel_scale), encircled_energy)
+            self._aperture_tables[key] = table
+        return table
+
+    def aperture_fraction(self, radius, fwhm=None):
+        """
+        Fraction of the flux of a point source within circular apertures.
+
+        The encircled energy of `~telescopy.Imager.psf` is tabulated once
+        per PSF parameters, plate scale and binning, so that the fractions
+        for arrays of radii and seeing conditions are a single vectorized
+        interpolation.
+
+        Parameters
+        ----------
+        radius : `~numpy.ndarray`
+            Aperture radii, in (binned) pixels
+        fwhm : `~astropy.units.Quantity` or None
+            FWHM of the PSF for each aperture (e.g. for a range of seeing
+            conditions), broadcast against ``radius``. Defaults to the FWHM
+            of `~telescopy.Imager.psf`.
+
+        Returns
+        -------
+        fraction : `~numpy.ndarray`
+            Fraction of the flux within each aperture
+        """
+        psf = self.psf
+        table_radius, encircled_energy = self._aperture_table(psf)
+        radius = np.asarray(radius, dtype=float)
+        if fwhm is not None:
+            radius = radius * (to_value(psf.fwhm, u.arcsec) /
+                               np.asarray(to_value(fwhm, u.arcsec),
+                                          dtype=float))
+        return np.interp(radius, table_radius, encircled_energy)
+
+    @property
+    def psf_std(self):
+        """
+        Standard deviation of the PSF in (binned) pixels.
+        """
+        return float(self.seeing / self.plate_scale / self.binning)
+
+    @quantity_input(exposure_duration=u.s)
+    def image(self, telescope, target, exposure_duration, filter, n=20,
+              sky_model=None):
         """
         Generate an image of ``target`` observed by ``telescope``.
 
@@ -54,26 +348,73 @@ class Imager(object):
         ----------
         telescope : `~telescopy.Telescope`
             Telescope object
-        target : `~telescopy.Target`
+        target : `~telescopy.BlackBody`
             Target object
         exposure_duration : `~astropy.units.Quantity`
             Exposure duration (s, or compatible unit)
+        filter : `~telescopy.Filter`
+            Filter object
         n : int
             Pixel length of a side of the image returned
+        sky_model : `~telescopy.SkyModel` or None
+            Atmospheric transmittance model
 
         Returns
         -------
         image : `~numpy.ndarray`
             Simulated image of ``target``.
         """
-        total_counts = self.counts(telescope, target, exposure_duration)
-        x, y = np.mgrid[:n, :n]
-        spread = float(self.seeing / self.plate_scale / self.binning)
-        img = gaussian_2d(x - n/2, y - n/2, 0, 0, spread) * total_counts
+        total_counts = self.counts(telescope, target, exposure_duration,
+                                   filter, sky_model)
+        img = render_scene((n, n), n / 2, n / 2, total_counts, self.psf_std,
+                           radius=n, sampling=self.psf_sampling)
         return np.array(img, dtype=int)
 
+    @quantity_input(exposure_duration=u.s)
+    def scene(self, telescope, targets, x, y, exposure_duration, filter,
+              shape, sky_model=None, out=None, cache=None, method='auto'):
+        """
+        Generate an image of many ``targets`` observed by ``telescope``.
+
+        Parameters
+        ----------
+        telescope : `~telescopy.Telescope`
+            Telescope object
+        targets : `~telescopy.TargetCollection`
+            Target objects
+        x : `~numpy.ndarray`
+            Column positions of the targets, in pixels
+        y : `~numpy.ndarray`
+            Row positions of the targets, in pixels
+        exposure_duration : `~astropy.units.Quantity`
+            Exposure duration (s, or compatible unit)
+        filter : `~telescopy.Filter`
+            Filter object
+        shape : tuple
+            Shape ``(n_rows, n_columns)`` of the image
+        sky_model : `~telescopy.SkyModel` or None
+            Atmospheric transmittance model
+        out : `~numpy.ndarray` or None
+            Preallocated float image to which the targets are added
+        cache : `~telescopy.CountsCache` or None
+            Cache of photon rates to reuse
+        method : {'auto', 'stamp', 'fft'}
+            Render each target separately, convolve all targets with the
+            PSF at once, or choose from the density of targets (see
+            `~telescopy.render_scene`)
+
+        Returns
+        -------
+        image : `~numpy.ndarray`
+            Simulated noiseless image of ``targets``, in ADU
+        """
+        total_counts = self.counts(telescope, targets, exposure_duration,
+                                   filter, sky_model, cache=cache)
+        return render_scene(shape, x, y, total_counts, self.psf_std, out=out,
+                            sampling=self.psf_sampling, method=method)
+
     def counts(self, telescope, target, exposure_duration, filter,
-               sky_model=None):
+               sky_model=None, cache=None):
         """
         Number of ADU detected by the detector.
 
@@ -81,18 +422,27 @@ class Imager(object):
         ----------
         telescope : `~telescopy.Telescope`
             Telescope object
-        target : `~telescopy.Target`
+        target : `~telescopy.BlackBody` or `~telescopy.TargetCollection`
             Target object
         exposure_duration : `~astropy.units.Quantity`
             Exposure duration (s, or compatible unit)
+        filter : `~telescopy.Filter`
+            Filter object
+        sky_model : `~telescopy.SkyModel` or None
+            Atmospheric transmittance model
+        cache : `~telescopy.CountsCache` or None
+            Cache of photon rates to reuse
 
         Returns
         -------
-        total_counts : float
-            Number of counts estimated in the exposure.
+        total_counts : int or `~numpy.ndarray`
+            Number of counts estimated in the exposure (a float for each
+            target of a `~telescopy.TargetCollection`).
         """
         total_electrons = (telescope.photons(target, exposure_duration,
-                                             filter, sky_model) *
+                                             filter, sky_model, cache=cache) *
                            self.quantum_efficiency)
         total_counts = total_electrons / self.gain
+        if np.ndim(total_counts) > 0:
+            return total_counts
         return int(total_counts)
\ No newline at end of file
@@ -0,0 +1,134 @@
+import numpy as np
+import astropy.units as u
+
+__all__ = ['trapezoid_weights', 'cell_edges', 'filter_support',
+           'filter_window', 'filter_weights', 'integrate_filter']
+
+
+def trapezoid_weights(x):
+    """
+    Weights which integrate samples at ``x`` with the trapezoidal rule.
+
+    Parameters
+    ----------
+    x : `~numpy.ndarray`
+        Sorted, possibly non-uniform, sample positions
+
+    Returns
+    -------
+    weights : `~numpy.ndarray`
+        Weights such that ``np.sum(y * weights)`` is the trapezoidal
+        integral of ``y`` sampled at ``x``
+    """
+    weights = np.zeros(len(x))
+    dx = np.diff(x)
+    weights[:-1] += dx / 2
+    weights[1:] += dx / 2
+    return weights
+
+
+def cell_edges(x):
+    """
+    Edges of the cells around samples at ``x`` whose widths are the
+    trapezoidal weights: midpoints between samples, and the first and last
+    samples.
+    """
+    return np.concatenate([x[:1], 0.5 * (x[1:] + x[:-1]), x[-1:]])
+
+
+def filter_support(filter):
+    """
+    Wavelength range outside of which the transmissivity of ``filter`` is
+    zero.
+
+    Parameters
+    ----------
+    filter : `~telescopy.Filter`
+        Filter object
+
+    Returns
+    -------
+    lo, hi : float
+        Wavelengths (Angstrom) of the last zero before the first nonzero
+        sample and of the first zero after the last nonzero sample (or of
+        the ends of the curve)
+    """
+    wavelength = filter.wavelength.to_value(u.Angstrom)
+    nonzero = np.flatnonzero(filter.transmissivity)
+    if len(nonzero) == 0:
+        return wavelength[0], wavelength[0]
+    lo = max(nonzero[0] - 1, 0)
+    hi = min(nonzero[-1] + 1, len(wavelength) - 1)
+    return wavelength[lo], wavelength[hi]
+
+
+def filter_window(grid, filter):
+    """
+    Slice of the sorted wavelength ``grid`` (Angstrom) covering the support
+    of ``filter``, found with `~numpy.searchsorted`.
+    """
+    lo, hi = filter_support(filter)
+    start = max(np.searchsorted(grid, lo, side='right') - 1, 0)
+    stop = min(np.searchsorted(grid, hi, side='left') + 1, len(grid))
+    return slice(start, stop)
+
+
+def filter_weights(grid, filter):
+    """
+    Integration weights of ``filter`` on a wavelength grid, restricted to
+    the filter's support.
+
+    Parameters
+    ----------
+    grid : `~numpy.ndarray`
+        Sorted wavelengths (Angstrom) on which spectra are sampled
+    filter : `~telescopy.Filter`
+        Filter object
+
+    Returns
+    -------
+    window : slice
+        Indices of ``grid`` covering the support of ``filter``
+    weights : `~numpy.ndarray`
+        Transmissivity times trapezoidal weights (Angstrom) on
+        ``grid[window]``, such that ``np.sum(y[window] * weights)`` is the
+        integral of ``y`` times the transmissivity over wavelength
+    """
+    window = filter_window(grid, filter)
+    x = grid[window]
+    transmissivity = np.interp(x, filter.wavelength.to_value(u.Angstrom),
+                               filter.transmissivity, left=0, right=0)
+    return window, transmissivity * trapezoid_weights(x)
+
+
+def integrate_filter(wavelength, values, filter):
+    """
+    Integral of ``values`` times the transmissivity of ``filter`` over
+    wavelength.
+
+    Only the samples within the support of the filter are used, with
+    trapezoidal weights on the (possibly non-uniform) ``wavelength`` grid.
+
+    Parameters
+    ----------
+    wavelength : `~astropy.units.Quantity`
+        Sorted wavelengths
+    values : `~astropy.units.Quantity` or `~numpy.ndarray`
+        Spectrum sampled at ``wavelength``, with shape ``(..., n)``
+    filter : `~telescopy.Filter`
+        Filter object
+
+    Returns
+    -------
+    integral : `~astropy.units.Quantity` or `~numpy.ndarray`
+        Integral with shape ``(...)``; Quantities are returned in the unit of
+        ``values`` times Angstrom
+    """
+    window, weights = filter_weights(
+        np.asarray(wavelength.to_value(u.Angstrom), dtype=float), filter)
+    unit = getattr(values, 'unit', None)
+    values = np.asarray(getattr(values, 'value', values))
+    integral = values[..., window] @ weights
+    if unit is None:
+        return integral
+    return integral * unit * u.Angstrom
@@ -0,0 +1,90 @@
+import os
+from multiprocessing import Pool
+
+import numpy as np
+import astropy.units as u
+
+from .catalog import read_catalog
+from .utils import quantity_input
+
+__all__ = ['parallel_counts']
+
+# Instrument configuration of a worker process, set once by `_init_worker`
+_worker_config = None
+
+
+def _init_worker(telescope, imager, filter, sky_model, exposure_duration):
+    global _worker_config
+    _worker_config = (telescope, imager, filter, sky_model, exposure_duration)
+    # Build the spectral response once per worker, not once per chunk
+    telescope.response(filter, sky_model)
+
+
+def _counts(targets, telescope, imager, filter, sky_model,
+            exposure_duration):
+    if imager is None:
+        return telescope.photons(targets, exposure_duration, filter,
+                                 sky_model)
+    return imager.counts(telescope, targets, exposure_duration, filter,
+                         sky_model)
+
+
+def _worker_counts(targets):
+    telescope, imager, filter, sky_model, exposure_duration = _worker_config
+    return _counts(targets, telescope, imager, filter, sky_model,
+                   exposure_duration)
+
+
+@quantity_input(exposure_duration=u.s)
+def parallel_counts(catalog, telescope, filter, exposure_duration,
+                    imager=None, sky_model=None, n_workers=None,
+                    chunk_size=50000, **catalog_kwargs):
+    """
+    Counts from every target in a catalog, computed with a process pool.
+
+    The catalog is split into chunks of ``chunk_size`` targets which are
+    distributed over ``n_workers`` processes. The instrument configuration
+    is sent to each worker once, when it starts, and the results are
+    returned in catalog order.
+
+    Parameters
+    ----------
+    catalog : `~numpy.ndarray`, `~astropy.table.Table`, str or `~telescopy.TargetCollection`
+        Catalog of targets; see `~telescopy.read_catalog`
+    telescope : `~telescopy.Telescope`
+        Telescope object
+    filter : `~telescopy.Filter`
+        Filter object
+    exposure_duration : `~astropy.units.Quantity`
+        Exposure duration (s, or compatible unit)
+    imager : `~telescopy.Imager` or None
+        Imager object. If None, the number of photons collected by the
+        telescope is returned instead of detector counts.
+    sky_model : `~telescopy.SkyModel` or None
+        Atmospheric transmittance model
+    n_workers : int or None
+        Number of worker processes (defaults to the number of CPUs). With
+        one worker, the counts are computed in this process.
+    chunk_size : int
+        Number of targets sent to a worker at a time
+    catalog_kwargs
+        Column names and units passed to `~telescopy.read_catalog`
+
+    Returns
+    -------
+    counts : `~numpy.ndarray`
+        Counts (or photons) from each target
+    """
+    targets = read_catalog(catalog, **catalog_kwargs)
+    config = (telescope, imager, filter, sky_model, exposure_duration)
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    if n_workers == 1 or len(targets) <= chunk_size:
+        return _counts(targets, *config)
+
+    with Pool(n_workers, initializer=_init_worker, initargs=config) as pool:
+        results = pool.map(_worker_counts, targets.chunks(chunk_size),
+                           chunksize=1)
+    return np.concatenate(results)
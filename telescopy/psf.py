@@ -0,0 +1,210 @@
+from abc import ABC, abstractmethod
+
+import astropy.units as u
+import numpy as np
+
+from .cache import _digest
+from .utils import quantity_input, to_value
+
+__all__ = ['GaussianPSF', 'MoffatPSF', 'TabulatedPSF']
+
+# Encircled-energy tables of each PSF shape, in units of radius / FWHM,
+# keyed by `PSF._key`
+_encircled_energy_tables = {}
+
+# Radii (in units of the FWHM) at which analytic encircled energies are
+# tabulated
+_radius_grid = np.concatenate([[0], np.geomspace(1e-3, 1e3, 1024)])
+
+
+class PSF(ABC):
+    """
+    Circularly symmetric point spread function with a full width at half
+    maximum ``fwhm``.
+
+    Subclasses define the shape of the PSF through ``_key`` and
+    ``_encircled_energy``; the encircled energy of the shape is tabulated
+    once and interpolated for every query.
+    """
+    @property
+    @abstractmethod
+    def _key(self):
+        """
+        Hashable parameters of the shape of the PSF (independent of its
+        FWHM).
+        """
+
+    @abstractmethod
+    def _encircled_energy(self):
+        """
+        Radii in units of the FWHM, and the fraction of the flux within
+        each radius.
+        """
+
+    def encircled_energy_table(self):
+        """
+        Encircled energy of the shape of this PSF, computed once per shape.
+
+        Returns
+        -------
+        radius : `~numpy.ndarray`
+            Radii, in units of the FWHM
+        encircled_energy : `~numpy.ndarray`
+            Fraction of the flux within each radius
+        """
+        table = _encircled_energy_tables.get(self._key)
+        if table is None:
+            radius, encircled_energy = self._encircled_energy()
+            radius.flags.writeable = False
+            encircled_energy.flags.writeable = False
+            table = (radius, encircled_energy)
+            _encircled_energy_tables[self._key] = table
+        return table
+
+    @quantity_input(radius=u.arcsec)
+    def aperture_fraction(self, radius, fwhm=None):
+        """
+        Fraction of the flux of a point source within circular apertures.
+
+        Parameters
+        ----------
+        radius : `~astropy.units.Quantity`
+            Aperture radii
+        fwhm : `~astropy.units.Quantity` or None
+            FWHM of the PSF (e.g. for a range of seeing conditions), which
+            is broadcast against ``radius``. Defaults to the FWHM of this
+            PSF.
+
+        Returns
+        -------
+        fraction : `~numpy.ndarray`
+            Fraction of the flux within each aperture
+        """
+        if fwhm is None:
+            fwhm = self.fwhm
+        table_radius, encircled_energy = self.encircled_energy_table()
+        scaled = (np.asarray(to_value(radius, u.arcsec), dtype=float) /
+                  np.asarray(to_value(fwhm, u.arcsec), dtype=float))
+        return np.interp(scaled, table_radius, encircled_energy)
+
+
+class GaussianPSF(PSF):
+    """
+    Gaussian point spread function.
+    """
+    @quantity_input(fwhm=u.arcsec)
+    def __init__(self, fwhm):
+        """
+        Parameters
+        ----------
+        fwhm : `~astropy.units.Quantity`
+            Full width at half maximum
+        """
+        self.fwhm = fwhm
+
+    @classmethod
+    @quantity_input(std=u.arcsec)
+    def from_std(cls, std):
+        """
+        Gaussian PSF with standard deviation ``std``.
+
+        Parameters
+        ----------
+        std : `~astropy.units.Quantity`
+            Standard deviation
+
+        Returns
+        -------
+        psf : `~telescopy.GaussianPSF`
+            Gaussian PSF
+        """
+        return cls(2 * np.sqrt(2 * np.log(2)) * std)
+
+    @property
+    def _key(self):
+        return ('gaussian',)
+
+    def _encircled_energy(self):
+        std = 1 / (2 * np.sqrt(2 * np.log(2)))
+        return (_radius_grid.copy(),
+                -np.expm1(-0.5 * (_radius_grid / std)**2))
+
+
+class MoffatPSF(PSF):
+    """
+    Moffat point spread function,
+    :math:`I(r) \\propto (1 + (r / \\alpha)^2)^{-\\beta}`.
+    """
+    @quantity_input(fwhm=u.arcsec)
+    def __init__(self, fwhm, beta=4.765):
+        """
+        Parameters
+        ----------
+        fwhm : `~astropy.units.Quantity`
+            Full width at half maximum
+        beta : float
+            Power index, larger than 1. The default is the value expected
+            for Kolmogorov turbulence (Trujillo et al. 2001).
+        """
+        if beta <= 1:
+            raise ValueError('beta should be larger than 1.')
+        self.fwhm = fwhm
+        self.beta = float(beta)
+
+    @property
+    def _key(self):
+        return ('moffat', self.beta)
+
+    def _encircled_energy(self):
+        alpha = 1 / (2 * np.sqrt(2**(1 / self.beta) - 1))
+        return (_radius_grid.copy(),
+                -np.expm1((1 - self.beta) *
+                          np.log1p((_radius_grid / alpha)**2)))
+
+
+class TabulatedPSF(PSF):
+    """
+    Point spread function from a tabulated radial profile.
+    """
+    @quantity_input(radius=u.arcsec)
+    def __init__(self, radius, intensity):
+        """
+        Parameters
+        ----------
+        radius : `~astropy.units.Quantity`
+            Increasing radii of the profile, starting at zero
+        intensity : `~numpy.ndarray`
+            Intensity at each radius, in any units. The PSF is assumed to
+            be zero beyond the last radius.
+        """
+        radius = u.Quantity(to_value(radius, u.arcsec), u.arcsec)
+        intensity = np.asarray(intensity, dtype=float)
+        if radius.shape != intensity.shape or radius.ndim != 1:
+            raise ValueError('radius and intensity should be one-dimensional '
+                             'arrays of the same length.')
+        if radius[0] != 0 or np.any(np.diff(radius) <= 0):
+            raise ValueError('radius should increase from zero.')
+
+        half = np.nonzero(intensity < intensity[0] / 2)[0]
+        if not len(half):
+            raise ValueError('The profile does not fall below half its '
+                             'central intensity.')
+        i = half[0]
+        self.fwhm = 2 * np.interp(intensity[0] / 2, intensity[[i, i - 1]],
+                                  radius.value[[i, i - 1]]) * u.arcsec
+        self.radius = radius
+        self.intensity = intensity
+
+    @property
+    def _key(self):
+        return ('tabulated', _digest(self.radius), _digest(self.intensity))
+
+    def _encircled_energy(self):
+        radius = (self.radius.to_value(u.arcsec) /
+                  to_value(self.fwhm, u.arcsec))
+        # Trapezoidal integral of 2 pi r I(r) dr
+        ring = radius * self.intensity
+        encircled = np.concatenate([[0], np.cumsum(0.5 * (ring[1:] +
+                                                          ring[:-1]) *
+                                                   np.diff(radius))])
+        return radius, encircled / encircled[-1]
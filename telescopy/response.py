@@ -0,0 +1,363 @@
+import numpy as np
+import astropy.units as u
+from astropy.constants import h, c
+
+from .integrate import cell_edges, filter_weights
+from .star import TargetCollection, _planck_dot, irradiance_unit
+from .utils import quantity_input, to_value
+
+__all__ = ['SpectralResponse', 'PhotonRateTable']
+
+# Canonical (SI) units of spectral irradiance per steradian, in which the
+# internal weights are stored
+_irradiance_unit_si = u.W / u.m**3 / u.sr
+
+
+class SpectralResponse(object):
+    """
+    Photon-collecting response of a telescope, filter and sky combination.
+
+    The per-wavelength weights (filter transmissivity, mean sky
+    transmittance, aperture area, trapezoidal wavelength step and photon
+    energy) are computed once, on the part of the filter's wavelength grid
+    where its transmissivity is nonzero, so that the photon rate from a
+    target is a dot product of its spectral irradiance at
+    `~telescopy.SpectralResponse.wavelength` with
+    `~telescopy.SpectralResponse.weights`.
+    """
+    def __init__(self, telescope, filter, sky_model=None):
+        """
+        Parameters
+        ----------
+        telescope : `~telescopy.Telescope`
+            Telescope object
+        filter : `~telescopy.Filter`
+            Filter object
+        sky_model : `~telescopy.SkyModel` or None
+            Atmospheric transmittance model
+        """
+        self.telescope = telescope
+        self.filter = filter
+        self.sky_model = sky_model
+
+        self._inputs = None
+        self.update()
+
+    def _current_inputs(self):
+        inputs = [self.telescope.aperture_diameter, self.telescope.throughput,
+                  self.filter.wavelength, self.filter.transmissivity]
+        if self.sky_model is not None:
+            inputs += [self.sky_model.wavelength, self.sky_model.transmittance]
+        return inputs
+
+    @property
+    def is_stale(self):
+        """
+        True if an attribute of the telescope, filter or sky model has been
+        reassigned since the weights were computed.
+
+        Arrays modified in place are not detected; call
+        `~telescopy.SpectralResponse.update` with ``force=True`` after doing
+        so.
+        """
+        return (self._inputs is None or
+                any(old is not new for old, new in
+                    zip(self._inputs, self._current_inputs())))
+
+    def update(self, force=False):
+        """
+        Recompute the weights if any input has changed.
+
+        Parameters
+        ----------
+        force : bool
+            Recompute the weights even if no input has changed.
+        """
+        if not force and not self.is_stale:
+            return
+
+        filter = self.filter
+        sky_model = self.sky_model
+
+        wavelength = filter.wavelength.to_value(u.Angstrom)
+        window, transmissivity_weights = filter_weights(wavelength, filter)
+        wavelength = wavelength[window] * u.Angstrom
+
+        if sky_model is not None:
+            sky_model_mean = sky_model.rebin(cell_edges(wavelength))
+        else:
+            sky_model_mean = 1
+
+        aperture = (np.pi * (to_value(self.telescope.aperture_diameter,
+                                      u.m) / 2)**2 * u.m**2)
+
+        nu = c / wavelength
+
+        weights = (self.telescope.throughput * transmissivity_weights *
+                   u.Angstrom * sky_model_mean * np.pi * u.sr * aperture /
+                   (h * nu))
+
+        self.wavelength = wavelength
+        self.weights = weights.to(1 / (irradiance_unit * u.s))
+        self._wavelength = wavelength.to_value(u.m)
+        self._weights = weights.to_value(1 / (_irradiance_unit_si * u.s))
+        self._inputs = self._current_inputs()
+        self._rate_tables = {}
+
+    def _photon_rates(self, T_eff, chunk_size=4096):
+        """
+        Photons per second per unit dilution from blackbodies with ``T_eff``
+        in K, evaluated ``chunk_size`` temperatures at a time.
+        """
+        self.update()
+        return _planck_dot(self._wavelength, T_eff, self._weights,
+                           chunk_size=chunk_size)
+
+    def _photon_rate(self, target):
+        """
+        Photons per second collected from ``target``, as a float (or an
+        array for a `~telescopy.TargetCollection`).
+        """
+        self.update()
+        if isinstance(target, TargetCollection):
+            return self._photon_rates(target._T_eff) * target._dilution
+        elif hasattr(target, '_irradiance'):
+            irradiance = target._irradiance(self._wavelength)
+            dilution = target._dilution
+        else:
+            irradiance = target.irradiance(self.wavelength).to_value(
+                _irradiance_unit_si)
+            dilution = ((target.radius / target.distance)**2).decompose().value
+        return dilution * irradiance @ self._weights
+
+    def photon_rate(self, target):
+        """
+        Rate of photons collected from ``target``.
+
+        Parameters
+        ----------
+        target : `~telescopy.BlackBody` or `~telescopy.TargetCollection`
+            Target object
+
+        Returns
+        -------
+        rate : `~astropy.units.Quantity`
+            Photons per second (for each target of a collection)
+        """
+        return self._photon_rate(target) / u.s
+
+    @quantity_input(exposure_duration=u.s)
+    def photons(self, target, exposure_duration):
+        """
+        Number of photons collected from ``target`` in ``exposure_duration``.
+
+        Parameters
+        ----------
+        target : `~telescopy.BlackBody` or `~telescopy.TargetCollection`
+            Target object
+        exposure_duration : `~astropy.units.Quantity`
+            Exposure duration (s, or compatible unit)
+
+        Returns
+        -------
+        n_photons : float or `~numpy.ndarray`
+            Number of photons collected (from each target of a collection)
+        """
+        return self._photon_rate(target) * to_value(exposure_duration, u.s)
+
+    @quantity_input(T_eff_min=u.K, T_eff_max=u.K)
+    def rate_table(self, T_eff_min=2000 * u.K, T_eff_max=50000 * u.K,
+                   n=512):
+        """
+        Blackbody photon-rate lookup table for this response.
+
+        Tables are kept in memory, and discarded when the weights are
+        recomputed.
+
+        Parameters
+        ----------
+        T_eff_min : `~astropy.units.Quantity`
+            Lowest effective temperature in the table
+        T_eff_max : `~astropy.units.Quantity`
+            Highest effective temperature in the table
+        n : int
+            Number of temperatures in the table
+
+        Returns
+        -------
+        table : `~telescopy.PhotonRateTable`
+            Lookup table
+        """
+        self.update()
+        key = (to_value(T_eff_min, u.K), to_value(T_eff_max, u.K), n)
+        if key not in self._rate_tables:
+            self._rate_tables[key] = PhotonRateTable.from_response(
+                self, T_eff_min, T_eff_max, n)
+        return self._rate_tables[key]
+
+
+class PhotonRateTable(object):
+    """
+    Lookup table of the photon rate from a blackbody as a function of its
+    effective temperature, for a fixed `~telescopy.SpectralResponse`.
+
+    Rates are tabulated per unit dilution factor :math:`(R/d)^2`, so the
+    photon rate of a blackbody is its dilution factor times the
+    interpolated rate at its effective temperature. Interpolation is a cubic
+    spline in log rate against log temperature.
+    """
+    def __init__(self, T_eff, rate, error_estimate=None):
+        """
+        Parameters
+        ----------
+        T_eff : `~astropy.units.Quantity`
+            Sorted effective temperatures of the table
+        rate : `~astropy.units.Quantity`
+            Photon rate per unit dilution factor at each temperature
+        error_estimate : float or None
+            Estimate of the maximum relative interpolation error of the
+            table (see `~telescopy.PhotonRateTable.from_response`)
+        """
+        from scipy.interpolate import CubicSpline
+
+        self.T_eff = T_eff
+        self.rate = rate
+        self.error_estimate = error_estimate
+
+        self._T_eff_range = (to_value(T_eff[0], u.K),
+                             to_value(T_eff[-1], u.K))
+        log_rate = np.log(np.maximum(to_value(rate, 1 / u.s),
+                                     np.finfo(float).tiny))
+        self._spline = CubicSpline(np.log(to_value(T_eff, u.K)), log_rate)
+
+    @classmethod
+    @quantity_input(T_eff_min=u.K, T_eff_max=u.K)
+    def from_response(cls, response, T_eff_min=2000 * u.K,
+                      T_eff_max=50000 * u.K, n=512):
+        """
+        Tabulate the photon rate through ``response``.
+
+        The maximum relative interpolation error is estimated as the largest
+        error at the midpoints (in log temperature) between tabulated
+        temperatures, where the spline error is typically largest. It is
+        an estimate, not a bound: errors elsewhere can be slightly larger.
+
+        Parameters
+        ----------
+        response : `~telescopy.SpectralResponse`
+            Response of the telescope + filter + sky combination
+        T_eff_min : `~astropy.units.Quantity`
+            Lowest effective temperature in the table
+        T_eff_max : `~astropy.units.Quantity`
+            Highest effective temperature in the table
+        n : int
+            Number of temperatures in the table
+
+        Returns
+        -------
+        table : `~telescopy.PhotonRateTable`
+            Lookup table
+        """
+        log_T = np.linspace(np.log(to_value(T_eff_min, u.K)),
+                            np.log(to_value(T_eff_max, u.K)), n)
+
+        def exact(log_T):
+            return response._photon_rates(np.exp(log_T))
+
+        table = cls(np.exp(log_T) * u.K, exact(log_T) / u.s)
+
+        midpoints = 0.5 * (log_T[1:] + log_T[:-1])
+        truth = exact(midpoints)
+        interpolated = table._photon_rate(np.exp(midpoints))
+        nonzero = truth > 0
+        table.error_estimate = float(np.max(
+            np.abs(interpolated[nonzero] / truth[nonzero] - 1), initial=0))
+        return table
+
+    @classmethod
+    def read(cls, path):
+        """
+        Read a table written by `~telescopy.PhotonRateTable.write`.
+
+        Parameters
+        ----------
+        path : str
+            Path to the ``.npz`` table
+
+        Returns
+        -------
+        table : `~telescopy.PhotonRateTable`
+            Lookup table
+        """
+        with np.load(path) as archive:
+            error_estimate = float(archive['error_estimate'])
+            return cls(archive['T_eff'] * u.K, archive['rate'] / u.s,
+                       None if np.isnan(error_estimate) else error_estimate)
+
+    def write(self, path):
+        """
+        Write the table to disk.
+
+        Parameters
+        ----------
+        path : str
+            Path to the ``.npz`` table
+        """
+        error_estimate = (np.nan if self.error_estimate is None
+                          else self.error_estimate)
+        np.savez(path, T_eff=to_value(self.T_eff, u.K),
+                 rate=to_value(self.rate, 1 / u.s),
+                 error_estimate=error_estimate)
+
+    def _photon_rate(self, T_eff):
+        """
+        Interpolated photon rate per unit dilution for ``T_eff`` in K.
+        """
+        T_eff = np.asarray(T_eff, dtype=float)
+        T_min, T_max = self._T_eff_range
+        if np.any((T_eff < T_min) | (T_eff > T_max)):
+            raise ValueError('T_eff outside of the table range {0}-{1} K.'
+                             .format(T_min, T_max))
+        return np.exp(self._spline(np.log(T_eff)))
+
+    @quantity_input(T_eff=u.K)
+    def photon_rate(self, T_eff):
+        """
+        Photon rate per unit dilution factor :math:`(R/d)^2`.
+
+        Parameters
+        ----------
+        T_eff : `~astropy.units.Quantity`
+            Effective temperatures
+
+        Returns
+        -------
+        rate : `~astropy.units.Quantity`
+            Photons per second per unit dilution factor
+        """
+        return self._photon_rate(to_value(T_eff, u.K)) / u.s
+
+    @quantity_input(T_eff=u.K, exposure_duration=u.s)
+    def photons(self, T_eff, radius, distance, exposure_duration):
+        """
+        Number of photons collected from blackbodies.
+
+        Parameters
+        ----------
+        T_eff : `~astropy.units.Quantity`
+            Effective temperatures of the targets
+        radius : `~astropy.units.Quantity`
+            Radii of the targets
+        distance : `~astropy.units.Quantity`
+            Distances to the targets
+        exposure_duration : `~astropy.units.Quantity`
+            Exposure duration (s, or compatible unit)
+
+        Returns
+        -------
+        n_photons : `~numpy.ndarray`
+            Number of photons collected from each target
+        """
+        dilution = (to_value(radius, u.m) / to_value(distance, u.m))**2
+        return (self._photon_rate(to_value(T_eff, u.K)) * dilution *
+                to_value(exposure_duration, u.s))
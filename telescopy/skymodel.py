@@ -1,8 +1,12 @@
 import numpy as np
 import os
+from collections import OrderedDict
+from hashlib import sha1
 import astropy.units as u
 
-__all__ = ['SkyModel']
+from .utils import quantity_input, cache_dir, to_value
+
+__all__ = ['SkyModel', 'rebin', 'airmass_at']
 
 
 cerro_paranal_X15_path = os.path.join(os.path.dirname(__file__), 'data',
@@ -12,10 +16,383 @@ cerro_paranal_X10_path = os.path.join(os.path.dirname(__file__), 'data',
                                       'CerroParanalAdvancedSkyModel_X1.0.txt')
 
 
+def rebin(x, y, bin_edges):
+    """
+    Flux-conserving rebinning of a sampled function onto new bins.
+
+    ``y`` is treated as piecewise linear between the samples at ``x`` (and
+    constant beyond the first and last samples), and the mean of that
+    function over each bin is computed exactly from its cumulative integral.
+    Bins which contain no samples get the mean of the interpolant, rather
+    than NaN.
+
+    Parameters
+    ----------
+    x : `~numpy.ndarray`
+        Sorted sample positions
+    y : `~numpy.ndarray`
+        Sample values, with shape ``(..., len(x))`` to rebin several
+        functions sampled at ``x`` at once
+    bin_edges : `~numpy.ndarray`
+        Sorted edges of the new bins, in the same units as ``x``
+
+    Returns
+    -------
+    mean : `~numpy.ndarray`
+        Mean of ``y`` within each of the ``len(bin_edges) - 1`` bins, with
+        shape ``(..., len(bin_edges) - 1)``
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bin_edges = np.asarray(bin_edges, dtype=float)
+
+    if bin_edges[0] < x[0]:
+        x = np.concatenate([[bin_edges[0]], x])
+        y = np.concatenate([y[..., :1], y], axis=-1)
+    if bin_edges[-1] > x[-1]:
+        x = np.concatenate([x, [bin_edges[-1]]])
+        y = np.concatenate([y, y[..., -1:]], axis=-1)
+
+    dx = np.diff(x)
+    dy = np.diff(y, axis=-1)
+    slope = np.divide(dy, dx, out=np.zeros_like(dy), where=dx > 0)
+    cumulative = np.concatenate([np.zeros(y.shape[:-1] + (1,)),
+                                 np.cumsum(dx * (y[..., :-1] + 0.5 * dy),
+                                           axis=-1)], axis=-1)
+
+    i = np.clip(np.searchsorted(x, bin_edges, side='right') - 1,
+                0, len(dx) - 1)
+    offset = bin_edges - x[i]
+    integral = (cumulative[..., i] +
+                offset * (y[..., i] + 0.5 * slope[..., i] * offset))
+
+    return np.diff(integral, axis=-1) / np.diff(bin_edges)
+
+
+def _log(transmittance):
+    return np.log(np.maximum(transmittance, np.finfo(float).tiny))
+
+
+def airmass_at(coordinates, times, location):
+    """
+    Airmass of targets at a series of times.
+
+    Parameters
+    ----------
+    coordinates : `~astropy.coordinates.SkyCoord`
+        Coordinates of one or more targets
+    times : `~astropy.time.Time`
+        Times of observation
+    location : `~astropy.coordinates.EarthLocation`
+        Location of the observatory
+
+    Returns
+    -------
+    airmass : `~numpy.ndarray`
+        Airmass (:math:`\\sec z`) with shape ``coordinates.shape +
+        times.shape``, NaN where the target is below the horizon
+    """
+    from astropy.coordinates import AltAz
+
+    coordinates = coordinates.reshape(coordinates.shape + (1,) * times.ndim)
+    frame = AltAz(obstime=times, location=location)
+    altitude = coordinates.transform_to(frame).alt
+    airmass = 1 / np.sin(altitude.to_value(u.rad))
+    airmass[altitude.to_value(u.rad) <= 0] = np.nan
+    return airmass
+
+
+# Sky tables read through `_read_sky_table`, by path
+_sky_tables = {}
+
+# Cerro Paranal sky models by airmass, most recently used last
+_cerro_paranal_models = OrderedDict()
+_cerro_paranal_models_maxsize = 32
+
+
+def _read_sky_table(path):
+    """
+    Wavelength and transmittance columns of a text sky table.
+
+    The table is parsed once and converted to a binary ``.npy`` file in the
+    telescopy cache directory, named after the path, size and modification
+    time of the text file so that edited tables are converted again. The
+    binary file is memory-mapped, and the read-only arrays are shared by
+    every caller in this process.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _sky_tables:
+        name = 'sky_{0}.npy'.format(sha1(repr(key).encode()).hexdigest())
+        try:
+            binary_path = os.path.join(cache_dir(), name)
+            if not os.path.exists(binary_path):
+                table = np.loadtxt(path, unpack=True, usecols=(0, 1))
+                temporary = '{0}.{1}.tmp'.format(binary_path, os.getpid())
+                with open(temporary, 'wb') as f:
+                    np.save(f, table)
+                os.replace(temporary, binary_path)
+            table = np.load(binary_path, mmap_mode='r')
+        except OSError:
+            table = np.loadtxt(path, unpack=True, usecols=(0, 1))
+            table.flags.writeable = False
+        _sky_tables[key] = (np.asarray(table[0]), np.asarray(table[1]))
+    return _sky_tables[key]
+
+
+# Wavelength, optical depth and log-transmittance offset of the Cerro
+# Paranal sky model, computed on first use
+_cerro_paranal = None
+
+
+def _cerro_paranal_optical_depth():
+    """
+    Optical depth representation of the Cerro Paranal sky model, fit
+    through its tabulated airmasses of 1.0 and 1.5.
+    """
+    global _cerro_paranal
+    if _cerro_paranal is None:
+        wavelength, transmittance_10 = _read_sky_table(cerro_paranal_X10_path)
+        wavelength_15, transmittance_15 = _read_sky_table(
+            cerro_paranal_X15_path)
+        transmittance_15 = np.interp(wavelength, wavelength_15,
+                                     transmittance_15)
+        log_10 = _log(transmittance_10)
+        optical_depth = (log_10 - _log(transmittance_15)) / 0.5
+        log_offset = log_10 + optical_depth
+        optical_depth.flags.writeable = False
+        log_offset.flags.writeable = False
+        _cerro_paranal = (u.Quantity(wavelength, u.nm, copy=False),
+                          optical_depth, log_offset)
+    return _cerro_paranal
+
+
 class SkyModel(object):
-    def __init__(self, wavelength, transmittance):
+    """
+    Atmospheric transmittance as a function of wavelength.
+
+    A sky model with an optical depth can be evaluated at any airmass
+    :math:`X`, as :math:`T(X) = \\exp(a - \\tau X)` with optical depth
+    :math:`\\tau` and offset :math:`a` (zero for pure Beer-Lambert
+    extinction).
+    """
+    def __init__(self, wavelength, transmittance, airmass=None):
+        """
+        Parameters
+        ----------
+        wavelength : `~astropy.units.Quantity`
+            Wavelengths of the transmittance curve
+        transmittance : `~numpy.ndarray`
+            Transmittance of the atmosphere
+        airmass : float or None
+            Airmass of the transmittance curve. If given, the optical depth
+            is derived from the transmittance assuming Beer-Lambert
+            extinction, so the model can be evaluated at other airmasses.
+        """
         self.wavelength = wavelength
         self.transmittance = transmittance
+        self.airmass = airmass
+        if airmass is not None:
+            self.optical_depth = -_log(transmittance) / airmass
+        else:
+            self.optical_depth = None
+        self._log_offset = 0
+        self._rebinned = {}
+        self._rebinned_inputs = None
+
+    @classmethod
+    def from_optical_depth(cls, wavelength, optical_depth, airmass=1.0,
+                           log_offset=0):
+        """
+        Sky model with transmittance :math:`\\exp(a - \\tau X)`.
+
+        Parameters
+        ----------
+        wavelength : `~astropy.units.Quantity`
+            Wavelengths of the optical depth curve
+        optical_depth : `~numpy.ndarray`
+            Optical depth per unit airmass, :math:`\\tau`
+        airmass : float
+            Airmass :math:`X` at which to evaluate the transmittance
+        log_offset : `~numpy.ndarray` or float
+            Log-transmittance at zero airmass, :math:`a`
+
+        Returns
+        -------
+        sky_model : `~telescopy.SkyModel`
+            Sky model at ``airmass``
+        """
+        sky_model = cls(wavelength,
+                        np.exp(log_offset - optical_depth * airmass))
+        sky_model.airmass = airmass
+        sky_model.optical_depth = optical_depth
+        sky_model._log_offset = log_offset
+        return sky_model
+
+    def _check_optical_depth(self):
+        if self.optical_depth is None:
+            raise ValueError('This SkyModel has no optical depth; give the '
+                             'airmass of its transmittance to evaluate it at '
+                             'other airmasses.')
+
+    def at_airmass(self, airmass):
+        """
+        Sky model at another airmass.
+
+        Parameters
+        ----------
+        airmass : float
+            Airmass
+
+        Returns
+        -------
+        sky_model : `~telescopy.SkyModel`
+            Sky model sharing this model's wavelength and optical depth
+            arrays
+        """
+        self._check_optical_depth()
+        return self.from_optical_depth(self.wavelength, self.optical_depth,
+                                       airmass, self._log_offset)
+
+    def transmittance_at(self, airmass, out=None):
+        """
+        Transmittance at an array of airmasses.
+
+        Parameters
+        ----------
+        airmass : `~numpy.ndarray`
+            Airmasses
+        out : `~numpy.ndarray` or None
+            Preallocated float64 array of shape
+            ``np.shape(airmass) + (len(wavelength),)``
+
+        Returns
+        -------
+        transmittance : `~numpy.ndarray`
+            Transmittance at each airmass and wavelength
+        """
+        self._check_optical_depth()
+        out = np.multiply.outer(-np.asarray(airmass, dtype=float),
+                                self.optical_depth, out=out)
+        out += self._log_offset
+        return np.exp(out, out=out)
+
+    @quantity_input(bin_edges=u.Angstrom)
+    def rebin_at_airmass(self, bin_edges, airmass, chunk_size=None):
+        """
+        Mean transmittance within each wavelength bin, at each airmass.
+
+        Only the part of the wavelength grid spanned by ``bin_edges`` is
+        evaluated, ``chunk_size`` airmasses at a time in one reused buffer.
+
+        Parameters
+        ----------
+        bin_edges : `~astropy.units.Quantity`
+            Sorted edges of the wavelength bins
+        airmass : `~numpy.ndarray`
+            Airmasses
+        chunk_size : int or None
+            Number of airmasses evaluated at a time. Defaults to a chunk of
+            about four million transmittance values.
+
+        Returns
+        -------
+        transmittance : `~numpy.ndarray`
+            Flux-conserving mean transmittance, with shape
+            ``np.shape(airmass) + (len(bin_edges) - 1,)``
+        """
+        self._check_optical_depth()
+        edges = to_value(bin_edges, u.Angstrom)
+        wavelength = self.wavelength.to_value(u.Angstrom)
+        start = max(np.searchsorted(wavelength, edges[0], side='right') - 1, 0)
+        stop = min(np.searchsorted(wavelength, edges[-1], side='left') + 1,
+                   len(wavelength))
+        wavelength = wavelength[start:stop]
+        optical_depth = self.optical_depth[start:stop]
+        log_offset = np.asarray(self._log_offset)
+        if log_offset.ndim > 0:
+            log_offset = log_offset[start:stop]
+
+        airmass = np.asarray(airmass, dtype=float)
+        flat = airmass.ravel()
+        if chunk_size is None:
+            chunk_size = max(2**22 // len(wavelength), 1)
+
+        result = np.empty((len(flat), len(edges) - 1))
+        buffer = np.empty((min(chunk_size, len(flat)), len(wavelength)))
+        for lo in range(0, len(flat), chunk_size):
+            chunk = flat[lo:lo + chunk_size]
+            transmittance = buffer[:len(chunk)]
+            np.multiply.outer(-chunk, optical_depth, out=transmittance)
+            transmittance += log_offset
+            np.exp(transmittance, out=transmittance)
+            result[lo:lo + chunk_size] = rebin(wavelength, transmittance,
+                                               edges)
+        return result.reshape(airmass.shape + (len(edges) - 1,))
+
+    @quantity_input(bin_edges=u.Angstrom)
+    def rebin(self, bin_edges):
+        """
+        Mean transmittance within each wavelength bin.
+
+        Results are memoized per set of ``bin_edges``, and the memo is
+        cleared if ``wavelength`` or ``transmittance`` are reassigned.
+
+        Parameters
+        ----------
+        bin_edges : `~astropy.units.Quantity`
+            Sorted edges of the wavelength bins
+
+        Returns
+        -------
+        transmittance : `~numpy.ndarray`
+            Flux-conserving mean transmittance in each bin (read-only)
+        """
+        inputs = (self.wavelength, self.transmittance)
+        if (self._rebinned_inputs is None or
+                any(old is not new for old, new in
+                    zip(self._rebinned_inputs, inputs))):
+            self._rebinned = {}
+            self._rebinned_inputs = inputs
+
+        edges = np.ascontiguousarray(bin_edges.to_value(u.Angstrom),
+                                     dtype=float)
+        key = edges.tobytes()
+        if key not in self._rebinned:
+            mean = rebin(self.wavelength.to_value(u.Angstrom),
+                         self.transmittance, edges)
+            mean.flags.writeable = False
+            self._rebinned[key] = mean
+        return self._rebinned[key]
+
+    @classmethod
+    def from_file(cls, path, wavelength_unit=u.nm, airmass=None):
+        """
+        Sky model from a text table of wavelength and transmittance.
+
+        The table is converted to a memory-mapped binary file on first use
+        and its arrays are shared, read-only, by every model read from it.
+
+        Parameters
+        ----------
+        path : str
+            Path to a whitespace-separated table whose first two columns are
+            wavelength and transmittance
+        wavelength_unit : `~astropy.units.Unit`
+            Unit of the wavelength column
+        airmass : float or None
+            Airmass of the table, needed to evaluate the model at other
+            airmasses
+
+        Returns
+        -------
+        sky_model : `~telescopy.SkyModel`
+            Sky model
+        """
+        wavelength, transmittance = _read_sky_table(path)
+        return cls(u.Quantity(wavelength, wavelength_unit, copy=False),
+                   transmittance, airmass=airmass)
 
     @classmethod
     def from_cerro_paranal(cls, airmass=1.0):
@@ -23,14 +400,35 @@ class SkyModel(object):
         Noll et al. (2012, A&A 543, A92), Jones et al. (2013, A&A 560, A91), Moehler et al. (2014, A&A 568, A9)
 
         https://www.eso.org/observing/etc/bin/gen/form?INS.MODE=swspectr+INS.NAME=SKYCALC
+
+        The model is tabulated at airmasses of 1.0 and 1.5. Other airmasses
+        are evaluated with a log-transmittance that is linear in airmass
+        through both tables, which are read only once (see
+        `~telescopy.SkyModel.from_file`). Recently used models are cached
+        and shared, with read-only arrays, between calls with the same
+        airmass.
+
+        Parameters
+        ----------
+        airmass : float
+            Airmass
+
+        Returns
+        -------
+        sky_model : `~telescopy.SkyModel`
+            Cerro Paranal sky model at ``airmass``
         """
-        if airmass == 1:
-            cerro_paranal_path = cerro_paranal_X10_path
-        elif airmass == 1.5:
-            cerro_paranal_path = cerro_paranal_X15_path
+        airmass = float(airmass)
+        sky_model = _cerro_paranal_models.get(airmass)
+        if sky_model is None:
+            wavelength, optical_depth, log_offset = (
+                _cerro_paranal_optical_depth())
+            sky_model = cls.from_optical_depth(wavelength, optical_depth,
+                                               airmass, log_offset)
+            sky_model.transmittance.flags.writeable = False
+            _cerro_paranal_models[airmass] = sky_model
+            if len(_cerro_paranal_models) > _cerro_paranal_models_maxsize:
+                _cerro_paranal_models.popitem(last=False)
         else:
-            raise ValueError('`Airmass` presently only supports X=1 or 1.5.')
-
-        wavelength, transmittance = np.loadtxt(cerro_paranal_path,
-                                               unpack=True)
-        return cls(wavelength * u.nm, transmittance)
+            _cerro_paranal_models.move_to_end(airmass)
+        return sky_model
@@ -1,11 +1,100 @@
-from astropy.modeling.blackbody import blackbody_lambda
+from astropy.constants import h, c, k_B
 import astropy.units as u
+import numpy as np
 
-__all__ = ['BlackBody']
+from .utils import quantity_input, to_value
+
+__all__ = ['BlackBody', 'TargetCollection', 'planck_lambda']
+
+# Units of spectral irradiance per steradian returned by `planck_lambda`
+irradiance_unit = u.erg / u.s / u.cm**2 / u.Angstrom / u.sr
+
+# Constants of the Planck function in SI units
+_hc = (h * c).to_value(u.J * u.m)
+_hc_k_B = (h * c / k_B).to_value(u.m * u.K)
+_log_two_hc2 = np.log((2 * h * c**2).to_value(u.W * u.m**2))
+_si_to_irradiance_unit = (u.W / u.m**3 / u.sr).to(irradiance_unit)
+
+
+def _planck_lambda(wavelength, T_eff, out=None):
+    """
+    Blackbody spectral radiance in W / m^3 / sr, for ``wavelength`` in m
+    and ``T_eff`` in K.
+
+    The radiance is evaluated as
+    :math:`2hc^2 \\lambda^{-5} e^{-x} / (1 - e^{-x})` with
+    :math:`x = hc / \\lambda k_B T`, in log space and with
+    `~numpy.expm1`, so that it neither overflows nor loses precision for
+    large or small :math:`x`. ``wavelength`` and ``T_eff`` are broadcast
+    against each other, and the result is written into ``out`` if given.
+    """
+    if out is None:
+        out = np.empty(np.broadcast(wavelength, T_eff).shape)
+    np.multiply(wavelength, T_eff, out=out)
+    np.divide(_hc_k_B, out, out=out)
+    one_minus_exp = -np.expm1(-out)
+    np.negative(out, out=out)
+    out -= 5 * np.log(wavelength)
+    out += _log_two_hc2
+    np.exp(out, out=out)
+    out /= one_minus_exp
+    return out
+
+
+def _planck_dot(wavelength, T_eff, weights, chunk_size=4096):
+    """
+    Dot product of the blackbody spectral radiance (W / m^3 / sr) at
+    ``wavelength`` (m) with ``weights``, for each temperature in the 1D
+    array ``T_eff`` (K), evaluated ``chunk_size`` temperatures at a time in
+    one reused buffer.
+    """
+    result = np.empty(len(T_eff))
+    buffer = np.empty((min(chunk_size, len(T_eff)), len(wavelength)))
+    for start in range(0, len(T_eff), chunk_size):
+        chunk = T_eff[start:start+chunk_size, np.newaxis]
+        radiance = _planck_lambda(wavelength, chunk, out=buffer[:len(chunk)])
+        result[start:start+chunk_size] = radiance @ weights
+    return result
+
+
+@quantity_input(wavelength=u.m, T_eff=u.K)
+def planck_lambda(wavelength, T_eff, out=None):
+    """
+    Blackbody spectral radiance per unit wavelength.
+
+    Broadcasts over ``wavelength`` and ``T_eff``, so that e.g.
+    ``planck_lambda(wavelength, T_eff[:, np.newaxis])`` returns the spectrum
+    of every temperature in ``T_eff``.
+
+    Parameters
+    ----------
+    wavelength : `~astropy.units.Quantity`
+        Wavelengths
+    T_eff : `~astropy.units.Quantity`
+        Effective temperatures
+    out : `~numpy.ndarray` or None
+        Preallocated float64 array of the broadcast shape of ``wavelength``
+        and ``T_eff``, into which the radiance values (in erg / s / cm^2 /
+        Angstrom / sr) are written.
+
+    Returns
+    -------
+    radiance : `~astropy.units.Quantity`
+        Spectral radiance, in erg / s / cm^2 / Angstrom / sr. Shares
+        memory with ``out`` if it was given.
+    """
+    T_eff = np.asarray(to_value(T_eff, u.K), dtype=float)
+    if np.any(T_eff <= 0):
+        raise ValueError('Temperature should be positive.')
+
+    out = _planck_lambda(np.asarray(to_value(wavelength, u.m), dtype=float),
+                         T_eff, out=out)
+    out *= _si_to_irradiance_unit
+    return u.Quantity(out, irradiance_unit, copy=False)
 
 
 class BlackBody(object):
-    @u.quantity_input(T_eff=u.K, distance=u.m)
+    @quantity_input(T_eff=u.K, distance=u.m)
     def __init__(self, T_eff, radius, distance):
         """
         Parameters
@@ -16,6 +105,246 @@ class BlackBody(object):
             Distance to the blackbody
         """
 
-        self.irradiance = lambda x: blackbody_lambda(x, T_eff)
+        self.T_eff = T_eff
         self.radius = radius
-        self.distance = distance
\ No newline at end of file
+        self.distance = distance
+
+    @property
+    def T_eff(self):
+        return self._T_eff * u.K
+
+    @T_eff.setter
+    def T_eff(self, T_eff):
+        self._T_eff = to_value(T_eff, u.K)
+
+    @property
+    def radius(self):
+        return self._radius * u.m
+
+    @radius.setter
+    def radius(self, radius):
+        self._radius = to_value(radius, u.m)
+
+    @property
+    def distance(self):
+        return self._distance * u.m
+
+    @distance.setter
+    def distance(self, distance):
+        self._distance = to_value(distance, u.m)
+
+    @property
+    def _dilution(self):
+        return (self._radius / self._distance)**2
+
+    def irradiance(self, wavelength):
+        """
+        Spectral radiance of the blackbody.
+
+        Parameters
+        ----------
+        wavelength : `~astropy.units.Quantity`
+            Wavelengths
+
+        Returns
+        -------
+        radiance : `~astropy.units.Quantity`
+            Spectral radiance, in erg / s / cm^2 / Angstrom / sr
+        """
+        return planck_lambda(wavelength, self.T_eff)
+
+    def _irradiance(self, wavelength):
+        """
+        Spectral radiance in W / m^3 / sr at ``wavelength`` in m.
+        """
+        return _planck_lambda(wavelength, self._T_eff)
+
+
+class TargetCollection(object):
+    """
+    Collection of blackbody targets stored as contiguous arrays.
+
+    Indexing with an integer returns a `~telescopy.BlackBody`, and indexing
+    with a slice or an index array returns a new collection (a view of the
+    same arrays for slices).
+    """
+    @quantity_input(T_eff=u.K, distance=u.m)
+    def __init__(self, T_eff, radius, distance):
+        """
+        Parameters
+        ----------
+        T_eff : `~astropy.units.Quantity`
+            Effective temperatures of the blackbodies
+        radius : `~astropy.units.Quantity`
+            Radii of the blackbodies
+        distance : `~astropy.units.Quantity`
+            Distances to the blackbodies
+        """
+        T_eff, radius, distance = np.broadcast_arrays(
+            np.atleast_1d(to_value(T_eff, u.K)),
+            np.atleast_1d(to_value(radius, u.m)),
+            np.atleast_1d(to_value(distance, u.m)))
+        self._T_eff = np.ascontiguousarray(T_eff.ravel(), dtype=float)
+        self._radius = np.ascontiguousarray(radius.ravel(), dtype=float)
+        self._distance = np.ascontiguousarray(distance.ravel(), dtype=float)
+
+    @classmethod
+    def _from_arrays(cls, T_eff, radius, distance):
+        """
+        Collection sharing the K and m arrays passed in, without validation.
+        """
+        collection = cls.__new__(cls)
+        collection._T_eff = T_eff
+        collection._radius = radius
+        collection._distance = distance
+        return collection
+
+    @classmethod
+    def from_targets(cls, targets):
+        """
+        Collection of a sequence of `~telescopy.BlackBody` objects.
+
+        Parameters
+        ----------
+        targets : list
+            `~telescopy.BlackBody` objects
+
+        Returns
+        -------
+        collection : `~telescopy.TargetCollection`
+            Targets in one collection
+        """
+        return cls._from_arrays(
+            np.array([target._T_eff for target in targets], dtype=float),
+            np.array([target._radius for target in targets], dtype=float),
+            np.array([target._distance for target in targets], dtype=float))
+
+    @classmethod
+    @quantity_input(T_eff=u.K, distance=u.m)
+    def from_magnitudes(cls, mags, filter_name, T_eff, distance=10 * u.pc,
+                        chunk_size=4096):
+        """
+        Blackbodies normalized to apparent magnitudes in a filter.
+
+        Each blackbody's radius is chosen so that its photon rate through
+        ``filter_name``, relative to Vega's (from the cached zero point of
+        the filter), matches its magnitude.
+
+        Parameters
+        ----------
+        mags : `~numpy.ndarray`
+            Apparent (Vega) magnitudes in ``filter_name``
+        filter_name : str
+            Name of the filter of the magnitudes. Must be one of the filters
+            returned by `~telescopy.Filter.available_filters()`, with a known
+            magnitude of Vega.
+        T_eff : `~astropy.units.Quantity`
+            Effective temperatures, which set the shapes of the spectra
+        distance : `~astropy.units.Quantity`
+            Distances to the blackbodies. Only the ratio of radius to
+            distance affects counts, so the default of 10 pc is arbitrary.
+        chunk_size : int
+            Number of temperatures integrated through the filter at a time
+
+        Returns
+        -------
+        targets : `~telescopy.TargetCollection`
+            Normalized blackbodies
+        """
+        from .filter import Filter
+        from .integrate import filter_weights
+        from .vega import vega
+
+        zero_point = vega.zero_point(filter_name)
+        if np.isnan(zero_point.mag):
+            raise ValueError('No magnitude of Vega is known in filter "{0}"'
+                             .format(filter_name))
+
+        filter = Filter.from_name(filter_name)
+        wavelength = filter.wavelength.to_value(u.Angstrom)
+        window, weights = filter_weights(wavelength, filter)
+        wavelength = (wavelength[window] * u.Angstrom).to_value(u.m)
+        # Photons / s / m^2 per unit radiance (W / m^3 / sr) and dilution
+        weights = (np.pi * weights * (1 * u.Angstrom).to_value(u.m) *
+                   wavelength / _hc)
+
+        mags, T_eff, distance = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(mags, dtype=float)),
+            np.atleast_1d(to_value(T_eff, u.K)),
+            np.atleast_1d(to_value(distance, u.m)))
+        T_eff = np.ascontiguousarray(T_eff.ravel(), dtype=float)
+        distance = np.ascontiguousarray(distance.ravel(), dtype=float)
+
+        rate = _planck_dot(wavelength, T_eff, weights, chunk_size=chunk_size)
+        vega_rate = zero_point.photon_rate.to_value(1 / u.s / u.m**2)
+        dilution = (vega_rate * 10**(-0.4 * (mags.ravel() - zero_point.mag)) /
+                    rate)
+
+        return cls._from_arrays(T_eff, distance * np.sqrt(dilution), distance)
+
+    @property
+    def T_eff(self):
+        return u.Quantity(self._T_eff, u.K, copy=False)
+
+    @property
+    def radius(self):
+        return u.Quantity(self._radius, u.m, copy=False)
+
+    @property
+    def distance(self):
+        return u.Quantity(self._distance, u.m, copy=False)
+
+    @property
+    def _dilution(self):
+        return (self._radius / self._distance)**2
+
+    def __len__(self):
+        return len(self._T_eff)
+
+    def __getitem__(self, index):
+        if np.ndim(index) == 0 and not isinstance(index, slice):
+            target = BlackBody.__new__(BlackBody)
+            target._T_eff = float(self._T_eff[index])
+            target._radius = float(self._radius[index])
+            target._distance = float(self._distance[index])
+            return target
+        return self._from_arrays(self._T_eff[index], self._radius[index],
+                                 self._distance[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def chunks(self, chunk_size):
+        """
+        Iterate over the collection in consecutive chunks.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of targets per chunk (the last chunk may be shorter)
+
+        Yields
+        ------
+        chunk : `~telescopy.TargetCollection`
+            View of ``chunk_size`` consecutive targets
+        """
+        for start in range(0, len(self), chunk_size):
+            yield self[start:start + chunk_size]
+
+    def irradiance(self, wavelength):
+        """
+        Spectral radiance of each blackbody.
+
+        Parameters
+        ----------
+        wavelength : `~astropy.units.Quantity`
+            Wavelengths
+
+        Returns
+        -------
+        radiance : `~astropy.units.Quantity`
+            Spectral radiance with shape ``(len(self), len(wavelength))``, in
+            erg / s / cm^2 / Angstrom / sr
+        """
+        return planck_lambda(wavelength, self.T_eff[:, np.newaxis])
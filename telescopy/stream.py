@@ -0,0 +1,115 @@
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import astropy.units as u
+
+from .catalog import iter_catalog, catalog_length
+from .parallel import _counts
+from .utils import quantity_input
+
+__all__ = ['stream_counts', 'StreamProgress']
+
+
+StreamProgress = namedtuple('StreamProgress', ['rows_done', 'rows_total',
+                                               'elapsed', 'rows_per_second'])
+StreamProgress.__doc__ = """
+Progress of `~telescopy.stream_counts` after each chunk.
+
+``rows_done`` counts rows written to the output file, including rows from a
+previous run which was resumed; ``rows_total`` is None if the length of the
+input is unknown. ``rows_per_second`` is the throughput of this run.
+"""
+
+
+def _completed_rows(output_path, block_size=2**20):
+    """
+    Number of complete result rows in ``output_path``, truncating any
+    partially written row left by an interrupted run.
+    """
+    newlines = 0
+    last_newline = 0
+    with open(output_path, 'rb+') as f:
+        position = 0
+        for block in iter(lambda: f.read(block_size), b''):
+            newlines += block.count(b'\n')
+            if b'\n' in block:
+                last_newline = position + block.rfind(b'\n') + 1
+            position += len(block)
+        if last_newline < position:
+            f.truncate(last_newline)
+    # Don't count the header line
+    return max(newlines - 1, 0)
+
+
+@quantity_input(exposure_duration=u.s)
+def stream_counts(input_path, output_path, telescope, filter,
+                  exposure_duration, imager=None, sky_model=None,
+                  chunk_size=100000, resume=True, **catalog_kwargs):
+    """
+    Compute counts for a catalog file chunk by chunk, with bounded memory.
+
+    Rows are read from ``input_path`` with `~telescopy.iter_catalog`, and the
+    counts for each chunk are appended to the CSV file ``output_path`` (one
+    row per target, under a ``counts`` header) before the next chunk is read.
+    This is a generator which yields a `~telescopy.StreamProgress` after each
+    chunk; iterate over it to run the pipeline.
+
+    If ``resume`` is True and ``output_path`` exists, the rows already in it
+    are kept and processing continues from the next input row.
+
+    Parameters
+    ----------
+    input_path : str
+        Path to a CSV, FITS or ``.npy`` catalog
+    output_path : str
+        Path to the CSV file of results
+    telescope : `~telescopy.Telescope`
+        Telescope object
+    filter : `~telescopy.Filter`
+        Filter object
+    exposure_duration : `~astropy.units.Quantity`
+        Exposure duration (s, or compatible unit)
+    imager : `~telescopy.Imager` or None
+        Imager object. If None, the number of photons collected by the
+        telescope is written instead of detector counts.
+    sky_model : `~telescopy.SkyModel` or None
+        Atmospheric transmittance model
+    chunk_size : int
+        Number of rows read and processed at a time
+    resume : bool
+        Continue an interrupted run rather than starting over
+    catalog_kwargs
+        Column names and units passed to `~telescopy.iter_catalog`
+
+    Yields
+    ------
+    progress : `~telescopy.StreamProgress`
+        Rows processed so far and throughput
+    """
+    rows_done = 0
+    if resume and os.path.exists(output_path):
+        rows_done = _completed_rows(output_path)
+    if (not resume or not os.path.exists(output_path) or
+            os.path.getsize(output_path) == 0):
+        with open(output_path, 'w') as f:
+            f.write('counts\n')
+
+    rows_total = catalog_length(input_path)
+    rows_resumed = rows_done
+    start_time = time.time()
+
+    with open(output_path, 'a') as output:
+        for targets in iter_catalog(input_path, chunk_size=chunk_size,
+                                    start=rows_done, **catalog_kwargs):
+            counts = _counts(targets, telescope, imager, filter, sky_model,
+                             exposure_duration)
+            np.savetxt(output, counts, fmt='%.17g')
+            output.flush()
+
+            rows_done += len(targets)
+            elapsed = time.time() - start_time
+            yield StreamProgress(rows_done, rows_total, elapsed,
+                                 (rows_done - rows_resumed) / elapsed
+                                 if elapsed > 0 else float('inf'))
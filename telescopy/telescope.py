@@ -1,10 +1,18 @@
+from collections import OrderedDict
+
 import numpy as np
 import astropy.units as u
-from astropy.constants import h, c
-from scipy.stats import binned_statistic
+
+from .integrate import cell_edges
+from .response import SpectralResponse
+from .star import BlackBody, TargetCollection, _planck_lambda
+from .utils import quantity_input, to_value
 
 __all__ = ['Telescope']
 
+# Maximum number of spectral responses cached on each telescope
+_responses_maxsize = 16
+
 
 def relative_flux(m1, m2):
     return 10**(0.4 * (m2 - m1))
@@ -14,7 +22,7 @@ class Telescope(object):
     """
     Container for information about a telescope.
     """
-    @u.quantity_input(aperture_diameter=u.m)
+    @quantity_input(aperture_diameter=u.m)
     def __init__(self, aperture_diameter=None, throughput=None):
         """
         Parameters
@@ -26,35 +34,212 @@ class Telescope(object):
         """
         self.aperture_diameter = aperture_diameter
         self.throughput = throughput
+        self._responses = OrderedDict()
+
+    def __getstate__(self):
+        # Cached responses are rebuilt on demand rather than pickled (e.g.
+        # to every worker of `~telescopy.parallel_counts`)
+        state = self.__dict__.copy()
+        state['_responses'] = OrderedDict()
+        return state
+
+    def response(self, filter, sky_model=None):
+        """
+        Precomputed spectral response of this telescope through ``filter``
+        and ``sky_model``.
+
+        The most recently used responses are cached on the telescope, and
+        rebuilt automatically when the telescope, filter or sky model
+        attributes are reassigned.
+
+        Parameters
+        ----------
+        filter : `~telescopy.Filter`
+            Filter object
+        sky_model : `~telescopy.SkyModel` or None
+            Atmospheric transmittance model
 
-    @u.quantity_input(exposure_duration=u.s)
-    def photons(self, target, exposure_duration, filter, sky_model=None):
+        Returns
+        -------
+        response : `~telescopy.SpectralResponse`
+            Response of the telescope + filter + sky combination
+        """
+        key = (id(filter), id(sky_model))
+        response = self._responses.get(key)
+        if response is None:
+            response = SpectralResponse(self, filter, sky_model)
+            self._responses[key] = response
+            if len(self._responses) > _responses_maxsize:
+                self._responses.popitem(last=False)
+        else:
+            self._responses.move_to_end(key)
+            response.update()
+        return response
 
-        delta_lambda = (np.median(np.diff(filter.wavelength)) *
-                        np.ones(len(filter.wavelength)))
+    @quantity_input(exposure_duration=u.s)
+    def photons(self, target, exposure_duration, filter, sky_model=None,
+                cache=None):
+        """
+        Number of photons collected from ``target``.
 
-        if sky_model is not None:
-            bins = np.linspace(filter.wavelength.min() - delta_lambda[0]/2,
-                               filter.wavelength.max() + delta_lambda[0]/2,
-                               len(filter.wavelength)+1)
+        Parameters
+        ----------
+        target : `~telescopy.BlackBody` or `~telescopy.TargetCollection`
+            Target object
+        exposure_duration : `~astropy.units.Quantity`
+            Exposure duration (s, or compatible unit)
+        filter : `~telescopy.Filter`
+            Filter object
+        sky_model : `~telescopy.SkyModel` or None
+            Atmospheric transmittance model
+        cache : `~telescopy.CountsCache` or None
+            Cache of photon rates to reuse
 
-            sky_bs = binned_statistic(sky_model.wavelength.to(u.Angstrom).value,
-                                      sky_model.transmittance,
-                                      bins=bins.to(u.Angstrom).value, statistic='mean')
-            sky_model_mean = sky_bs.statistic
+        Returns
+        -------
+        n_photons : int or `~numpy.ndarray`
+            Number of photons collected (a float for each target of a
+            `~telescopy.TargetCollection`).
+        """
+        if cache is None:
+            rate = self.response(filter, sky_model)._photon_rate(target)
         else:
-            sky_model_mean = np.ones(len(filter.wavelength))
+            rate = cache.photon_rate(self, target, filter, sky_model)
+        n_photons = rate * to_value(exposure_duration, u.s)
+        if isinstance(target, TargetCollection):
+            return n_photons
+        return int(n_photons)
+
+    @quantity_input(T_eff=u.K, exposure_duration=u.s)
+    def photons_batch(self, T_eff, radius, distance, exposure_duration,
+                      filter, sky_model=None, chunk_size=4096):
+        """
+        Number of photons collected from many blackbody targets at once.
 
-        aperture = np.pi * (self.aperture_diameter/2)**2
+        Equivalent to calling `~telescopy.Telescope.photons` on a
+        `~telescopy.BlackBody` for each element of ``T_eff``, ``radius`` and
+        ``distance``, but the filter and sky weights are computed only once
+        and the spectral integral is evaluated for all targets in a single
+        matrix product.
 
-        energy_rate = (target.irradiance(filter.wavelength) * sky_model_mean *
-                       np.pi * u.sr * (target.radius/target.distance)**2 * aperture *
-                       delta_lambda)
+        Parameters
+        ----------
+        T_eff : `~astropy.units.Quantity`
+            Effective temperatures of the targets
+        radius : `~astropy.units.Quantity`
+            Radii of the targets
+        distance : `~astropy.units.Quantity`
+            Distances to the targets
+        exposure_duration : `~astropy.units.Quantity`
+            Exposure duration (s, or compatible unit)
+        filter : `~telescopy.Filter`
+            Filter object
+        sky_model : `~telescopy.SkyModel` or None
+            Atmospheric transmittance model
+        chunk_size : int
+            Number of targets evaluated per matrix product, which bounds the
+            size of the temporary irradiance array.
+
+        Returns
+        -------
+        n_photons : `~numpy.ndarray`
+            Number of photons collected from each target (not truncated to
+            an integer, unlike `~telescopy.Telescope.photons`).
+        """
+        T_eff, radius, distance = np.broadcast_arrays(to_value(T_eff, u.K),
+                                                      to_value(radius, u.m),
+                                                      to_value(distance, u.m))
+        shape = T_eff.shape
+        T_eff = T_eff.ravel()
+
+        response = self.response(filter, sky_model)
+
+        rate = response._photon_rates(T_eff, chunk_size=chunk_size)
+
+        dilution = (radius / distance)**2
+        exposure = to_value(exposure_duration, u.s)
+
+        return rate.reshape(shape) * dilution * exposure
+
+    @quantity_input(exposure_duration=u.s)
+    def photons_airmass(self, target, airmass, exposure_duration, filter,
+                        sky_model, airmass_resolution=0.002):
+        """
+        Number of photons collected from targets at a series of airmasses.
+
+        The irradiance of each target and the filter weights are computed
+        once; only the atmospheric transmittance is evaluated at each
+        airmass, from the optical depth of ``sky_model``.
+
+        If ``airmass`` is one-dimensional, every target is evaluated at
+        every airmass exactly. If it has shape ``(n_targets, n_times)``
+        (e.g. from `~telescopy.airmass_at`), the photon rate of each target
+        is computed exactly on a grid of airmasses with relative spacing
+        ``airmass_resolution`` and interpolated to its own airmasses.
 
-        energy = energy_rate * exposure_duration
+        Parameters
+        ----------
+        target : `~telescopy.BlackBody` or `~telescopy.TargetCollection`
+            Target object
+        airmass : `~numpy.ndarray`
+            Airmasses, with shape ``(n_times,)`` or ``(n_targets, n_times)``.
+            NaN airmasses (e.g. below the horizon) give NaN photons.
+        exposure_duration : `~astropy.units.Quantity`
+            Exposure duration (s, or compatible unit)
+        filter : `~telescopy.Filter`
+            Filter object
+        sky_model : `~telescopy.SkyModel`
+            Atmospheric transmittance model with an optical depth
+        airmass_resolution : float
+            Relative spacing of the airmass grid for two-dimensional
+            ``airmass``
 
-        nu = c / filter.wavelength
-        n_photons_per_wl = (energy / (h * nu)).decompose()
+        Returns
+        -------
+        n_photons : `~numpy.ndarray`
+            Photons with shape ``(n_targets, n_times)``, or ``(n_times,)``
+            for a single `~telescopy.BlackBody`
+        """
+        single = isinstance(target, BlackBody)
+        if single:
+            target = TargetCollection.from_targets([target])
+
+        response = self.response(filter)
+        edges = cell_edges(response.wavelength)
+        irradiance_weights = (_planck_lambda(response._wavelength,
+                                             target._T_eff[:, np.newaxis]) *
+                              response._weights)
+
+        airmass = np.asarray(airmass, dtype=float)
+        if airmass.ndim <= 1:
+            sky = sky_model.rebin_at_airmass(edges, np.atleast_1d(airmass))
+            rate = irradiance_weights @ sky.T
+        else:
+            airmass = np.broadcast_to(airmass, (len(target),) +
+                                      airmass.shape[1:])
+            # Grid evenly spaced in log(airmass), so that the relative
+            # interpolation error is uniform up to large airmasses
+            log_airmass = np.log(airmass.reshape(len(target), -1))
+            finite = log_airmass[np.isfinite(log_airmass)]
+            low = finite.min() if len(finite) else 0.0
+            step = np.log1p(airmass_resolution)
+            n_grid = max(int(np.ceil((finite.max() - low) / step))
+                         if len(finite) else 0, 1) + 1
+            grid = np.exp(low + step * np.arange(n_grid))
+            grid_rate = (irradiance_weights @
+                         sky_model.rebin_at_airmass(edges, grid).T)
 
-        return int(self.throughput * np.sum(filter.transmissivity * n_photons_per_wl))
+            position = (log_airmass - low) / step
+            index = np.clip(np.floor(np.nan_to_num(position)).astype(int),
+                            0, n_grid - 2)
+            fraction = position - index
+            rate = ((1 - fraction) *
+                    np.take_along_axis(grid_rate, index, axis=1) +
+                    fraction * np.take_along_axis(grid_rate, index + 1,
+                                                  axis=1))
+            rate = rate.reshape(airmass.shape)
 
+        n_photons = (rate * target._dilution.reshape((-1,) + (1,) *
+                                                     (rate.ndim - 1)) *
+                     to_value(exposure_duration, u.s))
+        return n_photons[0] if single else n_photons
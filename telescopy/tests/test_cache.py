@@ -0,0 +1,52 @@
+import astropy.units as u
+from astropy.constants import R_sun
+
+from ..cache import CountsCache
+from ..filter import Filter
+from ..imager import Imager
+from ..star import BlackBody
+from ..telescope import Telescope
+
+
+def test_counts_cache():
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    filter = Filter.from_name('SDSS_r')
+    target = BlackBody(5777 * u.K, R_sun, 1 * u.pc)
+    cache = CountsCache(maxsize=2)
+
+    expected = telescope.photons(target, 2 * u.s, filter)
+    assert telescope.photons(target, 2 * u.s, filter, cache=cache) == expected
+    assert cache.info() == (0, 1, 2, 1)
+
+    # Exposure duration, quantum efficiency and gain are applied after the
+    # lookup
+    assert (telescope.photons(target, 4 * u.s, filter, cache=cache) ==
+            telescope.photons(target, 4 * u.s, filter))
+    imager = Imager(quantum_efficiency=0.5, gain=2.0)
+    assert (imager.counts(telescope, target, 1 * u.s, filter, cache=cache) ==
+            imager.counts(telescope, target, 1 * u.s, filter))
+    assert cache.info() == (2, 1, 2, 1)
+
+    # A different target or telescope misses
+    other_target = BlackBody(6000 * u.K, R_sun, 1 * u.pc)
+    telescope.photons(other_target, 1 * u.s, filter, cache=cache)
+    other_telescope = Telescope(aperture_diameter=2 * u.m, throughput=0.9)
+    assert (other_telescope.photons(target, 1 * u.s, filter, cache=cache) ==
+            other_telescope.photons(target, 1 * u.s, filter))
+    assert cache.info() == (2, 3, 2, 2)
+
+    # The least recently used entry (the first target on the first
+    # telescope) was evicted
+    telescope.photons(target, 1 * u.s, filter, cache=cache)
+    assert cache.info() == (2, 4, 2, 2)
+    other_telescope.photons(target, 1 * u.s, filter, cache=cache)
+    assert cache.info() == (3, 4, 2, 2)
+
+    # Reassigning an attribute misses
+    telescope.throughput = 0.45
+    assert (telescope.photons(target, 1 * u.s, filter, cache=cache) ==
+            telescope.photons(target, 1 * u.s, filter))
+    assert cache.info().misses == 5
+
+    cache.clear()
+    assert cache.info() == (0, 0, 2, 0)
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import astropy.units as u
+from astropy.table import Table
+from numpy.testing import assert_allclose
+
+from ..catalog import iter_catalog, read_catalog
+from ..filter import Filter
+from ..stream import stream_counts
+from ..telescope import Telescope
+
+
+def _table(n=1000):
+    rng = np.random.RandomState(42)
+    return Table([['star{0}'.format(i) for i in range(n)],
+                  rng.uniform(3000, 10000, n),
+                  rng.uniform(0.1, 2, n),
+                  rng.uniform(1, 100, n)],
+                 names=['name', 'T_eff', 'radius', 'distance'])
+
+
+def _concatenate(chunks):
+    chunks = list(chunks)
+    return (np.concatenate([c.T_eff.value for c in chunks]),
+            np.concatenate([c.radius.value for c in chunks]),
+            np.concatenate([c.distance.value for c in chunks]))
+
+
+def test_iter_catalog_string_column(tmpdir):
+    table = _table()
+    for extension, format in (('csv', 'ascii.csv'), ('fits', 'fits')):
+        path = str(tmpdir.join('catalog.{0}'.format(extension)))
+        table.write(path, format=format)
+
+        expected = read_catalog(path)
+        T_eff, radius, distance = _concatenate(iter_catalog(path,
+                                                            chunk_size=300))
+        assert_allclose(T_eff, expected.T_eff.value)
+        assert_allclose(radius, expected.radius.value)
+        assert_allclose(distance, expected.distance.value)
+
+    # Blank lines, including a trailing empty line
+    path = str(tmpdir.join('blank.csv'))
+    table.write(path, format='ascii.csv')
+    with open(path) as f:
+        lines = f.read().splitlines()
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines[:400] + [''] + lines[400:]) + '\n\n')
+    T_eff, _, _ = _concatenate(iter_catalog(path, chunk_size=300))
+    assert_allclose(T_eff, read_catalog(path).T_eff.value)
+    assert len(T_eff) == len(table)
+    T_eff, _, _ = _concatenate(iter_catalog(path, chunk_size=300,
+                                            start=500))
+    assert_allclose(T_eff, read_catalog(path).T_eff.value[500:])
+
+
+def test_iter_catalog_start(tmpdir):
+    path = str(tmpdir.join('catalog.csv'))
+    _table().write(path, format='ascii.csv')
+
+    T_eff, _, _ = _concatenate(iter_catalog(path, chunk_size=128, start=250))
+    assert_allclose(T_eff, read_catalog(path).T_eff.value[250:])
+
+
+def test_stream_counts_resume(tmpdir):
+    input_path = str(tmpdir.join('catalog.csv'))
+    _table().write(input_path, format='ascii.csv')
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    filter = Filter.from_name('SDSS_r')
+
+    complete_path = str(tmpdir.join('complete.csv'))
+    for _ in stream_counts(input_path, complete_path, telescope, filter,
+                           1 * u.s, chunk_size=300):
+        pass
+    complete = np.loadtxt(complete_path, skiprows=1)
+    assert len(complete) == 1000
+
+    # Interrupt a run after two chunks, leaving a partially written row
+    resumed_path = str(tmpdir.join('resumed.csv'))
+    stream = stream_counts(input_path, resumed_path, telescope, filter,
+                           1 * u.s, chunk_size=300)
+    next(stream)
+    next(stream)
+    stream.close()
+    with open(resumed_path, 'a') as f:
+        f.write('12345')
+
+    progress = list(stream_counts(input_path, resumed_path, telescope,
+                                  filter, 1 * u.s, chunk_size=300))
+    assert progress[-1].rows_done == 1000
+    assert len(progress) == 2
+    assert os.path.exists(resumed_path)
+    assert_allclose(np.loadtxt(resumed_path, skiprows=1), complete)
@@ -0,0 +1,30 @@
+import numpy as np
+import astropy.units as u
+from astropy.constants import R_sun
+from numpy.testing import assert_allclose
+
+from ..filter import Filter
+from ..star import BlackBody
+from ..telescope import Telescope
+
+
+def test_lam0():
+    transmissivity = np.array([0, 1, 1, 0.])
+
+    quantity = Filter(wavelength=[400, 500, 600, 700] * u.nm,
+                      transmissivity=transmissivity)
+    assert_allclose(quantity.lam0.to_value(u.Angstrom), 5500)
+
+    array = Filter(wavelength=np.array([4000, 5000, 6000, 7000.]),
+                   transmissivity=transmissivity)
+    assert array.lam0.unit == u.Angstrom
+    assert_allclose(array.lam0.value, 5500)
+
+    # Plain arrays work everywhere the filter is used
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.8)
+    target = BlackBody(5777 * u.K, R_sun, 1 * u.pc)
+    sdss_r = Filter.from_name('SDSS_r')
+    plain = Filter(wavelength=sdss_r.wavelength.to_value(u.Angstrom),
+                   transmissivity=np.array(sdss_r.transmissivity))
+    assert (telescope.photons(target, 1 * u.s, plain) ==
+            telescope.photons(target, 1 * u.s, sdss_r))
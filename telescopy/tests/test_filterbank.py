@@ -0,0 +1,78 @@
+import numpy as np
+import astropy.units as u
+from astropy.constants import R_sun
+from numpy.testing import assert_allclose
+
+from ..filter import Filter
+from ..filterbank import FilterBank
+from ..skymodel import SkyModel
+from ..star import TargetCollection
+from ..telescope import Telescope
+from ..vega import vega
+
+
+def _targets(n=20):
+    rng = np.random.RandomState(5)
+    return TargetCollection(rng.uniform(3000, 10000, n) * u.K,
+                            rng.uniform(0.1, 2, n) * R_sun,
+                            rng.uniform(1, 100, n) * u.pc)
+
+
+def _sky_model():
+    rng = np.random.RandomState(6)
+    return SkyModel(np.linspace(300, 1100, 1000) * u.nm,
+                    rng.uniform(0.5, 1, 1000))
+
+
+def test_integrate_matches_vega():
+    names = ['Johnson_V', 'SDSS_r', 'Stromgren_y', 'Kepler_K']
+    for sparse in (False, True):
+        bank = FilterBank(names, wavelength=vega.wavelength, sparse=sparse)
+        integral = bank.integrate(vega.flam)
+        assert integral.shape == (len(names),)
+        for name, value in zip(names, integral):
+            assert_allclose(value.to_value(u.erg / u.s / u.cm**2),
+                            vega.integrate_filter(Filter.from_name(name))
+                            .to_value(u.erg / u.s / u.cm**2), rtol=1e-12)
+
+        # Plain arrays, with leading dimensions
+        flux = np.stack([vega.flam.value, 2 * vega.flam.value])
+        assert_allclose(bank.integrate(flux),
+                        [integral.value, 2 * integral.value], rtol=1e-12)
+
+
+def test_photons_matches_telescope():
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    targets = _targets()
+
+    # Filters tabulated on the same grid give identical photons
+    names = ['SDSS_g', 'SDSS_r', 'SDSS_i']
+    for sparse in (False, True):
+        bank = FilterBank.from_names(names, sparse=sparse)
+        assert bank.names == names
+        for sky_model in (None, _sky_model()):
+            n_photons = bank.photons(telescope, targets, 2 * u.s, sky_model)
+            assert n_photons.shape == (20, 3)
+            for i, name in enumerate(names):
+                assert_allclose(n_photons[:, i],
+                                telescope.photons(targets, 2 * u.s,
+                                                  Filter.from_name(name),
+                                                  sky_model), rtol=1e-12)
+
+            single = bank.photons(telescope, targets[3], 2 * u.s, sky_model)
+            assert single.shape == (3,)
+            assert_allclose(single, n_photons[3], rtol=1e-12)
+
+    # Filters resampled onto the union of their grids, which differs from
+    # their own grids by the trapezoidal integration error
+    names = ['Johnson_V', 'SDSS_r', 'Stromgren_y', 'Kepler_K']
+    for sparse in (False, True):
+        bank = FilterBank(names, sparse=sparse)
+        for sky_model in (None, _sky_model()):
+            n_photons = bank.photons(telescope, targets, 2 * u.s, sky_model,
+                                     chunk_size=7)
+            for i, name in enumerate(names):
+                assert_allclose(n_photons[:, i],
+                                telescope.photons(targets, 2 * u.s,
+                                                  Filter.from_name(name),
+                                                  sky_model), rtol=1e-2)
@@ -0,0 +1,39 @@
+import numpy as np
+import astropy.units as u
+from numpy.testing import assert_allclose
+
+from ..frames import iter_frames, simulate_frames
+
+
+def test_generator_matches_buffer():
+    image = np.full((16, 16), 100.)
+    kwargs = dict(sky_rate=5, dark_current=0.1, read_noise=4, gain=2,
+                  full_well=1e5, seed=3, batch_size=7)
+    frames = simulate_frames(image, 10 * u.s, 20, **kwargs)
+    assert np.all(frames == np.array(list(iter_frames(image, 10 * u.s, 20,
+                                                      **kwargs))))
+
+
+def test_noise_statistics():
+    image = np.full((32, 32), 20.)
+    frames = simulate_frames(image, 10 * u.s, 400, sky_rate=5,
+                             dark_current=1, read_noise=4, gain=2,
+                             dtype=float, seed=0)
+    # Mean and variance in ADU of Poisson electrons plus read noise
+    electrons = 20 * 2 + (5 + 1) * 10
+    assert_allclose(frames.mean(), electrons / 2, rtol=0.01)
+    assert_allclose(frames.var(), (electrons + 4**2) / 4, rtol=0.02)
+
+
+def test_integer_range_saturates():
+    frames = simulate_frames(np.zeros((4, 4)), 1 * u.s, 3, read_noise=5,
+                             dtype=np.uint16, seed=1)
+    assert frames.max() < 100
+
+    frames = simulate_frames(np.full((4, 4), 1e6), 1 * u.s, 3,
+                             dtype=np.int16, seed=1)
+    assert np.all(frames == np.iinfo(np.int16).max)
+
+    frames = simulate_frames(np.full((4, 4), 1e6), 1 * u.s, 3,
+                             full_well=5e5, seed=1)
+    assert np.all(frames == 500000)
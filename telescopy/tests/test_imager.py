@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+import astropy.units as u
+from numpy.testing import assert_allclose
+
+from ..filter import Filter
+from ..imager import Imager, render_scene
+from ..psf import PSF, MoffatPSF, TabulatedPSF
+from ..star import BlackBody
+from ..telescope import Telescope
+from ..utils import trusted_mode
+
+
+def _stars(n, shape, seed=0):
+    rng = np.random.RandomState(seed)
+    return (rng.uniform(-5, shape[1] + 5, n), rng.uniform(-5, shape[0] + 5, n),
+            rng.uniform(1, 100, n))
+
+
+@pytest.mark.parametrize('sampling', ['center', 'integrated'])
+def test_stamp_fft_pixel_centers(sampling):
+    shape = (80, 100)
+    x, y, counts = _stars(300, shape)
+    x, y = np.round(x), np.round(y)
+
+    stamp = render_scene(shape, x, y, counts, 2.0, sampling=sampling,
+                         method='stamp')
+    fft = render_scene(shape, x, y, counts, 2.0, sampling=sampling,
+                       method='fft')
+    assert_allclose(fft, stamp, rtol=0, atol=1e-10 * stamp.max())
+
+
+@pytest.mark.parametrize('sampling', ['center', 'integrated'])
+def test_stamp_fft_sub_pixel(sampling):
+    shape = (64, 64)
+    x, y, counts = np.array([20.3, 40.7]), np.array([30.6, 15.2]), [1e3, 5e2]
+
+    stamp = render_scene(shape, x, y, counts, 2.0, sampling=sampling,
+                         method='stamp')
+    fft = render_scene(shape, x, y, counts, 2.0, sampling=sampling,
+                       method='fft')
+    # Bilinear placement conserves flux and centroids, and broadens the
+    # PSF slightly
+    assert_allclose(fft.sum(), stamp.sum(), rtol=1e-6)
+    rows, columns = np.mgrid[:64, :64]
+    for star in (columns < 32, columns >= 32):
+        for coordinate in (rows, columns):
+            assert_allclose(np.sum(fft * coordinate * star) /
+                            np.sum(fft * star),
+                            np.sum(stamp * coordinate * star) /
+                            np.sum(stamp * star), atol=1e-4)
+    assert_allclose(fft, stamp, rtol=0, atol=0.1 * stamp.max())
+
+
+def test_auto_method_and_out():
+    shape = (50, 50)
+    x, y, counts = _stars(2000, shape, seed=1)
+    out = np.ones(shape)
+
+    result = render_scene(shape, x, y, counts, 1.5, out=out)
+    assert result is out
+    stamp = render_scene(shape, x, y, counts, 1.5, method='stamp')
+    assert_allclose(out - 1, stamp, rtol=0, atol=0.05 * stamp.max())
+
+    with pytest.raises(ValueError):
+        render_scene(shape, x, y, counts, 1.5, method='direct')
+
+
+def test_integrated_sampling_conserves_flux():
+    image = render_scene((40, 40), 20.3, 19.6, 1000, 0.3,
+                         sampling='integrated')
+    assert_allclose(image.sum(), 1000)
+
+
+def test_aperture_fraction_trusted():
+    imager = Imager(plate_scale=0.5 * u.arcsec, seeing=1 * u.arcsec)
+    radius = np.array([1, 2, 4])
+    fwhm = np.array([1.5, 2.5])[:, np.newaxis]
+    expected = imager.aperture_fraction(radius, fwhm * u.arcsec)
+    # The default PSF is a Gaussian with standard deviation ``seeing``
+    assert_allclose(imager.aperture_fraction(radius),
+                    -np.expm1(-0.5 * (radius / 2)**2), rtol=1e-4)
+
+    with trusted_mode():
+        imager = Imager(plate_scale=0.5, seeing=1.0)
+        assert_allclose(imager.aperture_fraction(radius, fwhm), expected)
+
+
+def test_photons_trusted():
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.8)
+    filter = Filter.from_name('SDSS_r')
+    expected = telescope.photons(BlackBody(5800 * u.K, 6.957e8 * u.m,
+                                           3.0857e17 * u.m), 1 * u.s, filter)
+
+    with trusted_mode():
+        telescope = Telescope(1.0, 0.8)
+        photons = telescope.photons(BlackBody(5800, 6.957e8, 3.0857e17),
+                                    1.0, filter)
+    assert photons == expected
+
+
+def test_psf_models():
+    moffat = MoffatPSF(1 * u.arcsec, beta=2.5)
+    radius = np.linspace(0, 10, 2001)
+    alpha = 1 / (2 * np.sqrt(2**(1 / 2.5) - 1))
+    tabulated = TabulatedPSF(radius * u.arcsec,
+                             (1 + (radius / alpha)**2)**-2.5)
+    assert_allclose(tabulated.fwhm.value, 1, rtol=1e-6)
+    # The tabulated profile is truncated at 10 arcsec, where the Moffat
+    # profile has little flux left
+    assert_allclose(tabulated.aperture_fraction([0.5, 1] * u.arcsec),
+                    moffat.aperture_fraction([0.5, 1] * u.arcsec), rtol=1e-3)
+
+    class IncompletePSF(PSF):
+        @property
+        def _key(self):
+            return ('incomplete',)
+
+    with pytest.raises(TypeError):
+        IncompletePSF()
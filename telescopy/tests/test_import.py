@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules which are slow to import, and are only needed by some functions
+_heavy_modules = ['matplotlib.pyplot', 'scipy.interpolate', 'scipy.sparse',
+                  'astropy.table']
+
+
+@pytest.mark.parametrize('module', _heavy_modules)
+def test_import_is_lazy(module):
+    code = ('import sys, telescopy; '
+            'sys.exit({0!r} in sys.modules)'.format(module))
+    assert subprocess.call([sys.executable, '-c', code]) == 0, (
+        'importing telescopy imports {0}'.format(module))
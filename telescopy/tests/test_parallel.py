@@ -0,0 +1,45 @@
+import numpy as np
+import astropy.units as u
+from astropy.constants import R_sun
+from numpy.testing import assert_allclose
+
+from ..filter import Filter
+from ..imager import Imager
+from ..parallel import parallel_counts
+from ..star import TargetCollection
+from ..telescope import Telescope
+
+
+def _catalog(n=200):
+    rng = np.random.RandomState(4)
+    catalog = np.zeros(n, dtype=[('T_eff', float), ('radius', float),
+                                 ('distance', float)])
+    catalog['T_eff'] = rng.uniform(3000, 10000, n)
+    catalog['radius'] = rng.uniform(0.1, 2, n)
+    catalog['distance'] = rng.uniform(1, 100, n)
+    return catalog
+
+
+def test_parallel_counts_matches_photons():
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    filter = Filter.from_name('SDSS_r')
+    imager = Imager(quantum_efficiency=0.8, gain=2.0)
+    catalog = _catalog()
+    targets = TargetCollection(catalog['T_eff'] * u.K,
+                               catalog['radius'] * R_sun,
+                               catalog['distance'] * u.pc)
+    photons = telescope.photons(targets, 2 * u.s, filter)
+
+    # More targets than ``chunk_size``, so that the chunks are spread over
+    # the pool and concatenated
+    for catalog in (catalog, targets):
+        counts = parallel_counts(catalog, telescope, filter, 2 * u.s,
+                                 n_workers=2, chunk_size=30)
+        assert counts.shape == (200,)
+        assert_allclose(counts, photons, rtol=1e-12)
+
+        counts = parallel_counts(catalog, telescope, filter, 2 * u.s,
+                                 imager=imager, n_workers=2, chunk_size=30)
+        assert_allclose(counts, imager.counts(telescope, targets, 2 * u.s,
+                                              filter), rtol=1e-12)
+        assert_allclose(counts, photons * 0.8 / 2.0, rtol=1e-12)
@@ -0,0 +1,27 @@
+import numpy as np
+import astropy.units as u
+from numpy.testing import assert_allclose
+
+from ..filter import Filter
+from ..response import PhotonRateTable
+from ..telescope import Telescope
+
+
+def test_photon_rate_table(tmpdir):
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    response = telescope.response(Filter.from_name('SDSS_r'))
+    table = PhotonRateTable.from_response(response, 3000 * u.K,
+                                          10000 * u.K, n=64)
+
+    T_eff = np.random.RandomState(0).uniform(3000, 10000, 1000)
+    error = np.abs(table._photon_rate(T_eff) /
+                   response._photon_rates(T_eff) - 1)
+    assert 0 < table.error_estimate < 1e-6
+    # The estimate is the error at grid midpoints, close to the maximum
+    assert error.max() < 2 * table.error_estimate
+
+    path = str(tmpdir.join('table.npz'))
+    table.write(path)
+    copy = PhotonRateTable.read(path)
+    assert copy.error_estimate == table.error_estimate
+    assert_allclose(copy._photon_rate(T_eff), table._photon_rate(T_eff))
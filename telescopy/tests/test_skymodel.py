@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+import astropy.units as u
+from numpy.testing import assert_allclose
+
+from ..skymodel import SkyModel, rebin
+
+
+def _brute_force(x, y, bin_edges, n=20001):
+    means = []
+    for lo, hi in zip(bin_edges[:-1], bin_edges[1:]):
+        grid = np.linspace(lo, hi, n)
+        # np.interp is constant beyond the first and last samples
+        values = np.interp(grid, x, y)
+        means.append(np.sum(values[1:] + values[:-1]) / (2 * (n - 1)))
+    return np.array(means)
+
+
+def test_rebin_brute_force():
+    rng = np.random.RandomState(0)
+    x = np.sort(rng.uniform(0, 10, 50))
+    y = rng.uniform(0, 1, 50)
+    # Wide bins, bins narrower than the sample spacing (containing no
+    # samples), and bins beyond both ends of the samples
+    bin_edges = np.concatenate([[-2, -1], np.linspace(0.5, 3, 5),
+                                np.linspace(3.01, 3.05, 5), [6, 9.5, 12]])
+
+    assert_allclose(rebin(x, y, bin_edges), _brute_force(x, y, bin_edges),
+                    rtol=1e-6)
+
+
+def test_rebin_empty_bins_finite():
+    x = np.array([0., 1., 2.])
+    y = np.array([0., 1., 0.])
+    bin_edges = np.linspace(0.2, 0.3, 11)
+
+    assert_allclose(rebin(x, y, bin_edges),
+                    0.5 * (bin_edges[1:] + bin_edges[:-1]))
+
+
+def test_rebin_vectorized():
+    rng = np.random.RandomState(1)
+    x = np.sort(rng.uniform(0, 10, 50))
+    y = rng.uniform(0, 1, (3, 4, 50))
+    bin_edges = np.linspace(-1, 11, 30)
+
+    result = rebin(x, y, bin_edges)
+    assert result.shape == (3, 4, 29)
+    assert_allclose(result[2, 1], rebin(x, y[2, 1], bin_edges))
+
+
+def _optical_depth_model():
+    rng = np.random.RandomState(2)
+    wavelength = np.linspace(300, 1100, 500) * u.nm
+    return SkyModel.from_optical_depth(wavelength, rng.uniform(0, 0.5, 500),
+                                       log_offset=rng.uniform(-0.1, 0, 500))
+
+
+def test_at_airmass():
+    sky_model = _optical_depth_model()
+    at_2 = sky_model.at_airmass(2.0)
+    assert at_2.airmass == 2.0
+    assert at_2.optical_depth is sky_model.optical_depth
+    assert_allclose(at_2.transmittance,
+                    np.exp(sky_model._log_offset - 2 * sky_model.optical_depth))
+    assert_allclose(at_2.at_airmass(1.0).transmittance,
+                    sky_model.transmittance)
+
+    # Beer-Lambert extinction from a transmittance at a given airmass
+    beer_lambert = SkyModel(sky_model.wavelength, at_2.transmittance,
+                            airmass=2.0)
+    assert_allclose(beer_lambert.at_airmass(4.0).transmittance,
+                    at_2.transmittance**2)
+
+    with pytest.raises(ValueError):
+        SkyModel(sky_model.wavelength, at_2.transmittance).at_airmass(1.5)
+
+
+def test_transmittance_at():
+    sky_model = _optical_depth_model()
+    airmass = np.array([[1.0, 1.3], [2.1, 3.7]])
+
+    transmittance = sky_model.transmittance_at(airmass)
+    assert transmittance.shape == (2, 2, 500)
+    for index in np.ndindex(airmass.shape):
+        assert_allclose(transmittance[index],
+                        sky_model.at_airmass(airmass[index]).transmittance)
+
+    out = np.empty((2, 2, 500))
+    assert sky_model.transmittance_at(airmass, out=out) is out
+    assert_allclose(out, transmittance)
+
+
+def test_from_file_shared_read_only(tmpdir):
+    rng = np.random.RandomState(3)
+    table = np.column_stack([np.linspace(300, 1100, 200),
+                             rng.uniform(0.5, 1, 200)])
+    path = str(tmpdir.join('sky.txt'))
+    np.savetxt(path, table)
+
+    first = SkyModel.from_file(path, airmass=1.0)
+    second = SkyModel.from_file(path, wavelength_unit=u.Angstrom)
+    assert_allclose(first.wavelength.to_value(u.nm), table[:, 0])
+    assert_allclose(first.transmittance, table[:, 1])
+    assert second.wavelength.unit == u.Angstrom
+    assert np.shares_memory(first.transmittance, second.transmittance)
+    assert not first.transmittance.flags.writeable
+    with pytest.raises(ValueError):
+        first.transmittance[0] = 0
+
+    # Edited tables are read again
+    table[:, 1] /= 2
+    np.savetxt(path, table, fmt='%.10f')
+    assert_allclose(SkyModel.from_file(path).transmittance, table[:, 1])
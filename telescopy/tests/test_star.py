@@ -0,0 +1,76 @@
+import warnings
+
+import numpy as np
+import pytest
+import astropy.units as u
+from astropy.modeling.physical_models import BlackBody as AstropyBlackBody
+from numpy.testing import assert_allclose
+
+from ..filter import Filter
+from ..star import TargetCollection, planck_lambda, irradiance_unit
+from ..telescope import Telescope
+from ..vega import vega
+
+
+@pytest.mark.parametrize('T_eff', [3, 300, 5777, 1e5, 1e9])
+def test_planck_lambda_astropy(T_eff):
+    wavelength = np.geomspace(10, 1e7, 200) * u.nm
+    T_eff = T_eff * u.K
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        radiance = planck_lambda(wavelength, T_eff)
+    assert radiance.unit == irradiance_unit
+    assert np.all(np.isfinite(radiance)) and np.all(radiance >= 0)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = AstropyBlackBody(temperature=T_eff,
+                                    scale=1 * irradiance_unit)(wavelength)
+    expected = expected.to_value(irradiance_unit)
+    # astropy underflows to zero a little before the log-space evaluation
+    significant = expected > 1e-250
+    assert np.any(significant)
+    assert_allclose(radiance.value[significant], expected[significant],
+                    rtol=1e-10)
+
+
+def test_planck_lambda_broadcast_out():
+    wavelength = np.linspace(300, 1000, 50) * u.nm
+    T_eff = np.array([3000, 6000, 9000]) * u.K
+    out = np.empty((3, 50))
+
+    radiance = planck_lambda(wavelength, T_eff[:, np.newaxis], out=out)
+    assert np.shares_memory(radiance.value, out)
+    for i in range(3):
+        assert_allclose(radiance[i], planck_lambda(wavelength, T_eff[i]))
+
+    with pytest.raises(ValueError):
+        planck_lambda(wavelength, -1 * u.K)
+
+
+def test_from_magnitudes_round_trip():
+    filter = Filter.from_name('SDSS_r')
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=1)
+    zero_point = vega.zero_point('SDSS_r')
+    mags = np.linspace(-1, 20, 30)
+    T_eff = np.linspace(3000, 30000, 30) * u.K
+
+    targets = TargetCollection.from_magnitudes(mags, 'SDSS_r', T_eff)
+    area = np.pi * (telescope.aperture_diameter / 2)**2
+    vega_photons = (zero_point.photon_rate * area *
+                    1 * u.s).to_value(u.dimensionless_unscaled)
+    photons = telescope.photons(targets, 1 * u.s, filter)
+
+    assert_allclose(zero_point.mag - 2.5 * np.log10(photons / vega_photons),
+                    mags, atol=1e-6)
+    assert_allclose(targets.T_eff, T_eff)
+
+
+def test_from_magnitudes_unknown_vega_mag():
+    name = next((name for name in Filter.available_filters()
+                 if np.isnan(vega.zero_point(name).mag)), None)
+    if name is None:
+        pytest.skip('Every filter has a magnitude of Vega')
+    with pytest.raises(ValueError):
+        TargetCollection.from_magnitudes([10], name, 5000 * u.K)
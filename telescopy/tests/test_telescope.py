@@ -0,0 +1,127 @@
+import pickle
+
+import numpy as np
+import astropy.units as u
+from astropy.constants import R_sun
+from numpy.testing import assert_allclose
+
+from ..filter import Filter
+from ..skymodel import SkyModel
+from ..star import BlackBody, TargetCollection
+from ..telescope import Telescope, _responses_maxsize
+
+
+def _sky_model(seed):
+    rng = np.random.RandomState(seed)
+    return SkyModel(np.linspace(300, 1100, 1000) * u.nm,
+                    rng.uniform(0.5, 1, 1000))
+
+
+def test_response_cache_bounded():
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    filter = Filter.from_name('SDSS_r')
+    target = BlackBody(5777 * u.K, R_sun, 1 * u.pc)
+
+    first = _sky_model(0)
+    expected = telescope.photons(target, 1 * u.s, filter, first)
+    for seed in range(1, 3 * _responses_maxsize):
+        telescope.photons(target, 1 * u.s, filter, _sky_model(seed))
+    assert len(telescope._responses) == _responses_maxsize
+
+    # Evicted responses are rebuilt
+    assert telescope.photons(target, 1 * u.s, filter, first) == expected
+
+
+def test_pickle_excludes_responses():
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    filter = Filter.from_name('SDSS_r')
+    target = BlackBody(5777 * u.K, R_sun, 1 * u.pc)
+    expected = telescope.photons(target, 1 * u.s, filter, _sky_model(0))
+
+    copy = pickle.loads(pickle.dumps(telescope))
+    assert len(copy._responses) == 0
+    assert len(telescope._responses) == 1
+    assert copy.photons(target, 1 * u.s, filter, _sky_model(0)) == expected
+
+
+def test_photons_batch_matches_photons():
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    filter = Filter.from_name('SDSS_r')
+    rng = np.random.RandomState(0)
+    T_eff = rng.uniform(3000, 10000, 50) * u.K
+    radius = rng.uniform(0.1, 2, 50) * R_sun
+    distance = rng.uniform(1, 100, 50) * u.pc
+
+    for sky_model in (None, _sky_model(0)):
+        batch = telescope.photons_batch(T_eff, radius, distance, 2 * u.s,
+                                        filter, sky_model, chunk_size=16)
+        loop = [telescope.photons(BlackBody(*target), 2 * u.s, filter,
+                                  sky_model)
+                for target in zip(T_eff, radius, distance)]
+        # photons() truncates to an integer
+        assert np.all(np.abs(batch - loop) < 1)
+
+
+def test_target_collection_matches_photons():
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    filter = Filter.from_name('SDSS_r')
+    rng = np.random.RandomState(1)
+    targets = TargetCollection(rng.uniform(3000, 10000, 50) * u.K,
+                               rng.uniform(0.1, 2, 50) * R_sun,
+                               rng.uniform(1, 100, 50) * u.pc)
+
+    collection = telescope.photons(targets, 2 * u.s, filter)
+    assert collection.shape == (50,)
+    loop = [telescope.photons(target, 2 * u.s, filter)
+            for target in targets]
+    assert np.all(np.abs(collection - loop) < 1)
+
+    # Slices are views which give the same photons
+    assert_allclose(telescope.photons(targets[10:20], 2 * u.s, filter),
+                    collection[10:20], rtol=1e-12)
+    assert isinstance(targets[3], BlackBody)
+    assert targets[3].T_eff == targets.T_eff[3]
+
+
+def test_photons_airmass_matches_photons():
+    telescope = Telescope(aperture_diameter=1 * u.m, throughput=0.9)
+    filter = Filter.from_name('SDSS_r')
+    rng = np.random.RandomState(2)
+    targets = TargetCollection(rng.uniform(3000, 10000, 5) * u.K,
+                               rng.uniform(0.1, 2, 5) * R_sun,
+                               rng.uniform(1, 100, 5) * u.pc)
+    sky_model = SkyModel.from_optical_depth(np.linspace(300, 1100, 1000) *
+                                            u.nm, rng.uniform(0, 0.3, 1000))
+
+    def expected(targets, airmass):
+        return telescope.photons(targets, 2 * u.s, filter,
+                                 sky_model.at_airmass(airmass))
+
+    # Every target at every airmass
+    airmass = np.array([1.0, 1.2, 1.7, 2.9])
+    n_photons = telescope.photons_airmass(targets, airmass, 2 * u.s, filter,
+                                          sky_model)
+    assert n_photons.shape == (5, 4)
+    for j, X in enumerate(airmass):
+        assert_allclose(n_photons[:, j], expected(targets, X), rtol=1e-4)
+
+    # Each target at its own airmasses, below the horizon at one time
+    airmass = rng.uniform(1, 3, (5, 3))
+    airmass[2, 1] = np.nan
+    n_photons = telescope.photons_airmass(targets, airmass, 2 * u.s, filter,
+                                          sky_model)
+    assert n_photons.shape == (5, 3)
+    assert np.isnan(n_photons[2, 1])
+    assert np.sum(np.isnan(n_photons)) == 1
+    for i, j in zip(*np.nonzero(np.isfinite(airmass))):
+        assert_allclose(n_photons[i, j],
+                        expected(targets[i:i + 1], airmass[i, j])[0],
+                        rtol=1e-4)
+
+    # A single target gives one value per airmass
+    n_photons = telescope.photons_airmass(targets[0], airmass[:1], 2 * u.s,
+                                          filter, sky_model)
+    assert n_photons.shape == (3,)
+    assert_allclose(n_photons,
+                    [expected(targets[:1], X)[0] for X in airmass[0]],
+                    rtol=1e-4)
@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+from ..filter import Filter, register_filter, _filter_index, _filters
+from ..vega import Vega, mags_path
+
+
+def test_zero_points_without_magnitude():
+    with open(mags_path) as f:
+        mags = json.load(f)
+    names = Filter.available_filters()
+    missing = [name for name in names if name not in mags]
+    known = [name for name in names if name in mags]
+    assert missing
+
+    # A fresh instance, which has not read the magnitudes yet, computing
+    # zero points for filters without a known magnitude
+    vega = Vega()
+    filters = {name: Filter.from_name(name) for name in missing + known}
+    digests = {name: '' for name in filters}
+    zero_points = vega._compute_zero_points(filters, digests)
+
+    for name in missing:
+        assert np.isnan(zero_points[name]['mag'])
+    for name in known:
+        assert zero_points[name]['mag'] == mags[name]
+    assert np.all([zero_points[name]['photon_rate'] > 0
+                   for name in filters])
+
+
+def test_zero_point_registered_alias():
+    sdss_r = Filter.from_name('SDSS_r')
+    filter = Filter(wavelength=sdss_r.wavelength,
+                    transmissivity=np.array(sdss_r.transmissivity),
+                    name='orig')
+    register_filter(filter, name='alias')
+    try:
+        vega = Vega()
+        assert_allclose(vega.zero_point('alias').photon_rate,
+                        vega.zero_point('SDSS_r').photon_rate)
+        assert np.isnan(vega.zero_point('alias').mag)
+    finally:
+        _filter_index().pop('alias', None)
+        _filters.pop('alias', None)
@@ -2,3 +2,113 @@
 
 # This sub-module is destined for common non-package specific utility
 # functions.
+import os
+from contextlib import contextmanager
+from functools import wraps
+
+import astropy.units as u
+from astropy.config.paths import get_cache_dir
+
+__all__ = ['set_trusted', 'is_trusted', 'trusted_mode', 'quantity_input',
+           'to_value', 'cache_dir']
+
+_trusted = False
+
+
+def set_trusted(trusted=True):
+    """
+    Enable or disable trusted mode.
+
+    In trusted mode, functions decorated with
+    `~telescopy.utils.quantity_input` skip unit validation of their
+    arguments. Arguments must then either be `~astropy.units.Quantity`
+    objects with compatible units, or plain numbers already in the
+    canonical units of each argument.
+
+    Parameters
+    ----------
+    trusted : bool
+        Skip unit validation if True
+    """
+    global _trusted
+    _trusted = bool(trusted)
+
+
+def is_trusted():
+    """
+    True if trusted mode is enabled.
+    """
+    return _trusted
+
+
+@contextmanager
+def trusted_mode(trusted=True):
+    """
+    Context manager which enables trusted mode within its block.
+
+    Parameters
+    ----------
+    trusted : bool
+        Skip unit validation if True
+    """
+    previous = _trusted
+    set_trusted(trusted)
+    try:
+        yield
+    finally:
+        set_trusted(previous)
+
+
+def quantity_input(**kwargs):
+    """
+    Version of `~astropy.units.quantity_input` which is skipped in trusted
+    mode.
+    """
+    def decorator(func):
+        validated = u.quantity_input(**kwargs)(func)
+
+        @wraps(func)
+        def wrapper(*args, **kw):
+            if _trusted:
+                return func(*args, **kw)
+            return validated(*args, **kw)
+        return wrapper
+    return decorator
+
+
+def to_value(quantity, unit):
+    """
+    Value of ``quantity`` in ``unit``.
+
+    Plain numbers and arrays are assumed to already be in ``unit``.
+
+    Parameters
+    ----------
+    quantity : `~astropy.units.Quantity`, float or `~numpy.ndarray`
+        Quantity to convert
+    unit : `~astropy.units.Unit`
+        Canonical unit
+
+    Returns
+    -------
+    value : float or `~numpy.ndarray`
+        Value of ``quantity`` in ``unit``
+    """
+    if hasattr(quantity, 'unit'):
+        return quantity.to_value(unit)
+    return quantity
+
+
+def cache_dir():
+    """
+    Directory in which telescopy stores data files derived from its bundled
+    data, created if necessary.
+
+    Returns
+    -------
+    path : str
+        The ``telescopy`` subdirectory of the astropy cache directory
+    """
+    path = os.path.join(get_cache_dir(), 'telescopy')
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -1,9 +1,16 @@
 import os
+from collections import namedtuple
 from astropy.io import fits
-import matplotlib.pyplot as plt
+from astropy.constants import h, c
 import astropy.units as u
 import numpy as np
-from json import load
+from json import load, dump
+
+from .cache import _digest
+from .filter import Filter
+from .filterbank import FilterBank
+from .integrate import integrate_filter
+from .utils import cache_dir
 
 __all__ = ['vega']
 
@@ -13,17 +20,56 @@ vega_path = os.path.join(os.path.dirname(__file__), 'data',
 # https://classic.sdss.org/dr7/algorithms/sdssUBVRITransform.html#vega_sun_colors
 mags_path = os.path.join(os.path.dirname(__file__), 'data', 'mags', 'vega.json')
 
+# Version of the zero-point table file format
+_zero_points_version = 2
+
+ZeroPoint = namedtuple('ZeroPoint', ['flux', 'photon_rate', 'mag'])
+ZeroPoint.__doc__ = """
+Zero point of a filter: Vega's flux (as returned by
+`~telescopy.vega.Vega.integrate_filter`) and photon rate per unit area within
+the filter, and Vega's magnitude in it.
+"""
+
 
 class Vega(object):
     """
     Container object for the spectrum of Vega.
     """
     def __init__(self):
-        # TODO: lazy load
-        vega = fits.getdata(vega_path)
-        self.wavelength = vega['WAVELENGTH'] * u.Angstrom
-        self.flam = vega['FLUX'] * u.erg / u.s / u.cm**2 / u.Angstrom
+        self._wavelength = None
+        self._flam = None
         self._mags = None
+        self._zero_points = None
+
+    def _load(self):
+        """
+        Read the spectrum of Vega, as zero-copy views of the memory-mapped
+        FITS table.
+        """
+        vega = fits.getdata(vega_path, memmap=True)
+        self._wavelength = u.Quantity(vega['WAVELENGTH'], u.Angstrom,
+                                      copy=False)
+        self._flam = u.Quantity(vega['FLUX'],
+                                u.erg / u.s / u.cm**2 / u.Angstrom,
+                                copy=False)
+
+    @property
+    def wavelength(self):
+        """
+        Wavelengths of the spectrum of Vega, read on first access.
+        """
+        if self._wavelength is None:
+            self._load()
+        return self._wavelength
+
+    @property
+    def flam(self):
+        """
+        Spectral flux density of Vega, read on first access.
+        """
+        if self._flam is None:
+            self._load()
+        return self._flam
 
     def plot(self, ax=None):
         """
@@ -39,17 +85,22 @@ class Vega(object):
         ax : `~matplotlib.pyplot.Axes`
             Plot with spectrum  of Vega
         """
+        import matplotlib.pyplot as plt
+
         if ax is None:
             fig, ax = plt.subplots()
         ax.semilogx(self.wavelength, self.flam)
         ax.set(xlabel='Wavelength [Angstrom]',
-               ylabel=r'$F_\lambda$ [{0}]'.format(self.flux.unit))
+               ylabel=r'$F_\lambda$ [{0}]'.format(self.flam.unit))
         return ax
 
     def integrate_filter(self, filter):
         """
         Integrate Vega's spectral flux density within ``filter``.
 
+        Only the part of the spectrum within the support of the filter is
+        used, with trapezoidal weights on Vega's wavelength grid.
+
         Parameters
         ----------
         filter : `~telescopy.Filter`
@@ -60,11 +111,8 @@ class Vega(object):
         flux : `~astropy.units.Quantity`
             Flux within ``filter``
         """
-        interp_transmissivity = np.interp(self.wavelength, filter.wavelength,
-                                          filter.transmissivity,
-                                          left=0, right=0)
-        flux = self.flam * self.wavelength * interp_transmissivity
-        return np.sum(flux)
+        return integrate_filter(self.wavelength, self.flam,
+                                filter).to(u.erg / u.s / u.cm**2)
 
     def mag(self, filter_name):
         """
@@ -81,8 +129,127 @@ class Vega(object):
         mag : float
             Magnitude of Vega in ``filter_name``
         """
+        return self._load_mags()[filter_name]
+
+    def _load_mags(self):
+        """
+        Magnitudes of Vega in each filter with a known magnitude, read on
+        first access.
+        """
         if self._mags is None:
-            self._mags = load(open(mags_path))
-        return self._mags[filter_name]
+            with open(mags_path) as f:
+                self._mags = load(f)
+        return self._mags
+
+    def _source_files(self):
+        return {path: [os.stat(path).st_size, os.stat(path).st_mtime]
+                for path in (vega_path, mags_path)}
+
+    def _compute_zero_points(self, filters, digests):
+        """
+        Zero points of all ``filters`` (a dict of filters by registered
+        name) in one pass over the spectrum.
+        """
+        names = list(filters)
+        bank = FilterBank([filters[name] for name in names],
+                          wavelength=self.wavelength, sparse=True)
+        flam = self.flam.to_value(u.erg / u.s / u.cm**2 / u.Angstrom)
+        wavelength = self.wavelength.to_value(u.Angstrom)
+        flux = bank.integrate(flam)
+        photon_rate = bank.integrate(
+            flam * wavelength / (h * c).to_value(u.erg * u.Angstrom))
+
+        mags = self._load_mags()
+        return {name: {'digest': digests[name],
+                       'flux': flux[i],
+                       'photon_rate': photon_rate[i],
+                       'mag': mags.get(name, np.nan)}
+                for i, name in enumerate(names)}
+
+    def _load_zero_points(self):
+        """
+        Zero points of every available filter, read from the cached table
+        or recomputed if a filter (or Vega's spectrum) has changed.
+        """
+        filters = {name: Filter.from_name(name)
+                   for name in Filter.available_filters()}
+        digests = {name: _digest(f.wavelength) + _digest(f.transmissivity)
+                   for name, f in filters.items()}
+        sources = self._source_files()
+
+        path = os.path.join(cache_dir(), 'vega_zero_points.json')
+        try:
+            with open(path) as f:
+                table = load(f)
+            valid = (table['version'] == _zero_points_version and
+                     table['sources'] == sources and
+                     {name: entry['digest'] for name, entry in
+                      table['filters'].items()} == digests)
+        except (OSError, ValueError, KeyError):
+            valid = False
+
+        if not valid:
+            table = {'version': _zero_points_version, 'sources': sources,
+                     'filters': self._compute_zero_points(filters, digests)}
+            try:
+                temporary = '{0}.{1}.tmp'.format(path, os.getpid())
+                with open(temporary, 'w') as f:
+                    dump(table, f)
+                os.replace(temporary, path)
+            except OSError:
+                pass
+
+        self._zero_points = {
+            name: ZeroPoint(entry['flux'] * u.erg / u.s / u.cm**2,
+                            entry['photon_rate'] / u.s / u.cm**2,
+                            entry['mag'])
+            for name, entry in table['filters'].items()}
+
+    def zero_point(self, filter_name):
+        """
+        Zero point of filter ``filter_name``.
+
+        The zero points of every available filter are computed together the
+        first time one is needed, and cached on disk until a filter's data or
+        Vega's spectrum change.
+
+        Parameters
+        ----------
+        filter_name : str
+            Name of filter. Must be one of the filters returned by
+            `~telescopy.Filter.available_filters()`.
+
+        Returns
+        -------
+        zero_point : tuple
+            Named tuple of ``flux``, ``photon_rate`` and ``mag``. ``mag`` is
+            NaN for filters without a known magnitude of Vega.
+        """
+        if (self._zero_points is None or
+                filter_name not in self._zero_points):
+            self._load_zero_points()
+        return self._zero_points[filter_name]
+
+    def zero_points(self):
+        """
+        Zero points of every available filter.
+
+        Returns
+        -------
+        table : `~astropy.table.Table`
+            Table with columns ``filter``, ``flux``, ``photon_rate`` and
+            ``mag``
+        """
+        from astropy.table import Table
+
+        if self._zero_points is None:
+            self._load_zero_points()
+        names = sorted(self._zero_points)
+        return Table([names,
+                      u.Quantity([self._zero_points[n].flux for n in names]),
+                      u.Quantity([self._zero_points[n].photon_rate
+                                  for n in names]),
+                      [self._zero_points[n].mag for n in names]],
+                     names=['filter', 'flux', 'photon_rate', 'mag'])
 
 vega = Vega()